@@ -10,6 +10,9 @@ from flask_wtf.csrf import CSRFProtect
 from app.factories.service_factory import ServiceFactory
 from app.helpers.env_validator import validate_env_vars
 from app.error_handlers import register_error_handlers
+# Registers the sqlite:// rate limit storage
+from app.helpers import rate_limit_storage
+from app.helpers.template_cache import bytecode_cache
 
 
 # Initialize extensions
@@ -17,7 +20,8 @@ oauth = OAuth()
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
+    # Shared by every worker on the host, so limits hold across gunicorn workers
+    storage_uri=os.getenv("RATELIMIT_STORAGE_URI", rate_limit_storage.sqlite_uri(rate_limit_storage.DEFAULT_DB_PATH))
 )
 
 csrf = CSRFProtect()
@@ -26,9 +30,18 @@ def create_app():
     # Create a Flask app instance
     validate_env_vars()
     app = Flask(__name__)
+    app.jinja_options = {**app.jinja_options, "bytecode_cache": bytecode_cache()}
     app.model_dao = ServiceFactory.create_model_dao()
     app.feature_service = ServiceFactory.create_feature_service()
     app.prediction_service = ServiceFactory.create_prediction_service()
+    app.render_pool = ServiceFactory.create_render_pool()
+    app.state_store = ServiceFactory.create_state_store()
+    app.prediction_history_dao = ServiceFactory.create_prediction_history_dao()
+    app.pdf_cache = ServiceFactory.create_pdf_cache()
+    app.report_job_service = ServiceFactory.create_report_job_service()
+    app.bulk_report_service = ServiceFactory.create_bulk_report_service()
+    app.admin_directory_service = ServiceFactory.create_admin_directory_service()
+    app.model_report_service = ServiceFactory.create_model_report_service()
 
     # Load configuration
     app.config.from_object(Config)
@@ -25,5 +25,8 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///site.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Rendering settings
+    CHART_FORMAT = os.getenv("CHART_FORMAT", "png")  # "png" (matplotlib) or "svg" (template)
+
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
\ No newline at end of file
@@ -1,7 +1,9 @@
 import os
 import pymysql
 import time
-from flask import flash, current_app
+import logging
+
+logger = logging.getLogger(__name__)
 
 DB_HOST = os.getenv("DB_HOST")
 DB_USER = os.getenv("DB_USER")
@@ -24,7 +26,7 @@ def get_connection():
             )
         except pymysql.MySQLError as e:
             retries += 1
-            current_app.logger.warning(f"Database connection failed (attempt {retries}/{MAX_RETRIES}): {e}")
+            logger.warning(f"Database connection failed (attempt {retries}/{MAX_RETRIES}): {e}")
             if retries < MAX_RETRIES:
                 time.sleep(RETRY_DELAY)
             else:
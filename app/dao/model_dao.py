@@ -2,6 +2,7 @@ from app.dao.db import get_connection
 import logging
 import pymysql
 from threading import local
+from app.helpers import fork_safety
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,13 @@ class ModelDAO:
         Initialize ModelDAO with a thread-local database connection.
         """
         self.local = local()
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Drop the connections inherited from the parent process without closing their sockets.
+        """
+        self.local = local()
 
     @property
     def db_connection(self):
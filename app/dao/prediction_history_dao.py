@@ -0,0 +1,185 @@
+from app.dao.db import get_connection
+import logging
+import pymysql
+from threading import local
+from app.helpers import fork_safety
+
+logger = logging.getLogger(__name__)
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS PredictionHistory (
+        predictionId BIGINT AUTO_INCREMENT PRIMARY KEY,
+        userId VARCHAR(255),
+        model VARCHAR(255) NOT NULL,
+        prediction INT NOT NULL,
+        features JSON NOT NULL,
+        contributions JSON,
+        explanation TEXT,
+        createdAt DATETIME NOT NULL,
+        INDEX idx_prediction_history_user (userId, predictionId)
+    )
+"""
+
+HISTORY_COLUMNS = ["predictionId", "createdAt", "userId", "model", "prediction", "features", "contributions", "explanation"]
+
+
+class PredictionHistoryDAO:
+    """Data Access Object for the prediction history."""
+
+    def __init__(self):
+        """
+        Initialize PredictionHistoryDAO with a thread-local database connection.
+        """
+        self.local = local()
+        self.table_ready = False
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Drop the connections inherited from the parent process without closing their sockets.
+        """
+        self.local = local()
+
+    @property
+    def db_connection(self):
+        """
+        Get the thread-local database connection. Reconnect if necessary.
+        """
+        if not hasattr(self.local, "connection") or not self.local.connection or not self.local.connection.open:
+            self.local.connection = get_connection()
+        return self.local.connection
+
+    def ensure_table(self):
+        """
+        Create the PredictionHistory table if it does not exist yet.
+
+        Called before the first read or write of this DAO, so /history works on a fresh database
+        before the first prediction is flushed.
+        """
+        with self.db_connection.cursor() as cursor:
+            cursor.execute(CREATE_TABLE_SQL)
+        self.db_connection.commit()
+        self.table_ready = True
+
+    def insert_predictions(self, rows):
+        """
+        Insert a batch of predictions with a single multi-row INSERT.
+
+        Args:
+            rows (list): Tuples of (userId, model, prediction, features, contributions, explanation, createdAt).
+
+        Raises:
+            pymysql.MySQLError: If the insert fails, so the caller can retry the batch.
+        """
+        if not rows:
+            return
+        if not self.table_ready:
+            self.ensure_table()
+        try:
+            with self.db_connection.cursor() as cursor:
+                # PyMySQL rewrites executemany on INSERT ... VALUES into multi-row statements
+                cursor.executemany(
+                    """
+                    INSERT INTO PredictionHistory
+                        (userId, model, prediction, features, contributions, explanation, createdAt)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    rows,
+                )
+            self.db_connection.commit()
+        except pymysql.MySQLError:
+            self.db_connection.rollback()
+            raise
+
+    def get_predictions(self, before_id=None, limit=50, user_id=None):
+        """
+        Fetch one page of predictions, newest first, using keyset pagination.
+
+        Args:
+            before_id (int): Only return predictions with a lower ID (the last ID of the previous page).
+            limit (int): Maximum number of predictions to return.
+            user_id (str): Optionally restrict the page to a single user.
+
+        Returns:
+            list: Prediction rows, or an empty list if an error occurs.
+        """
+        conditions = []
+        params = []
+        if before_id is not None:
+            conditions.append("predictionId < %s")
+            params.append(before_id)
+        if user_id is not None:
+            conditions.append("userId = %s")
+            params.append(user_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        try:
+            if not self.table_ready:
+                self.ensure_table()
+            with self.db_connection.cursor() as cursor:
+                sql = f"""
+                    SELECT {', '.join(HISTORY_COLUMNS)}
+                    FROM PredictionHistory
+                    {where}
+                    ORDER BY predictionId DESC
+                    LIMIT %s
+                """
+                cursor.execute(sql, (*params, limit))
+                return cursor.fetchall()
+        except pymysql.MySQLError as e:
+            logger.error(f"Error fetching prediction history: {e}", exc_info=True)
+            return []
+
+    def get_predictions_by_ids(self, prediction_ids):
+        """
+        Fetch the given predictions.
+
+        Args:
+            prediction_ids (list): IDs of the predictions.
+
+        Returns:
+            list: Prediction rows in the order of `prediction_ids`, missing IDs are skipped.
+        """
+        if not prediction_ids:
+            return []
+        try:
+            if not self.table_ready:
+                self.ensure_table()
+            with self.db_connection.cursor() as cursor:
+                placeholders = ", ".join(["%s"] * len(prediction_ids))
+                cursor.execute(
+                    f"SELECT {', '.join(HISTORY_COLUMNS)} FROM PredictionHistory WHERE predictionId IN ({placeholders})",
+                    tuple(prediction_ids),
+                )
+                rows = {row["predictionId"]: row for row in cursor.fetchall()}
+        except pymysql.MySQLError as e:
+            logger.error(f"Error fetching predictions {prediction_ids}: {e}", exc_info=True)
+            return []
+        return [rows[prediction_id] for prediction_id in prediction_ids if prediction_id in rows]
+
+    def iter_predictions(self, batch_size=500):
+        """
+        Stream every prediction, oldest first, without loading the history into memory.
+
+        Uses a dedicated connection with an unbuffered server-side cursor, so the thread-local
+        connection stays usable while the export is running.
+
+        Args:
+            batch_size (int): Number of rows fetched from the server at a time.
+
+        Yields:
+            dict: One prediction row at a time.
+        """
+        if not self.table_ready:
+            self.ensure_table()
+        connection = get_connection()
+        try:
+            with connection.cursor(pymysql.cursors.SSDictCursor) as cursor:
+                cursor.execute(f"SELECT {', '.join(HISTORY_COLUMNS)} FROM PredictionHistory ORDER BY predictionId")
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+        finally:
+            connection.close()
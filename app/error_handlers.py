@@ -8,6 +8,13 @@ def register_error_handlers(app):
     def not_found_error(error):
         return render_template("errors/404.html"), 404
 
+    @app.errorhandler(503)
+    def service_unavailable_error(error):
+        response = app.make_response((render_template("errors/503.html"), 503))
+        if getattr(error, "retry_after", None):
+            response.headers["Retry-After"] = str(error.retry_after)
+        return response
+
     @app.errorhandler(500)
     def internal_server_error(error):
         return render_template("errors/500.html"), 500
@@ -0,0 +1,94 @@
+import logging
+import threading
+from flask import g, has_app_context
+from app.helpers import fork_safety
+
+logger = logging.getLogger(__name__)
+
+# Lifetimes of registered services
+SINGLETON = "singleton"
+REQUEST = "request"
+
+
+class ServiceContainer:
+    """
+    Registry of the services of the application and how long each instance lives.
+
+    A service is registered by name with a provider, a callable that receives the container and
+    builds the service, resolving its own dependencies through `get`. Singletons are built once
+    per process and shared by every service that depends on them. Per-request services are built
+    at most once per request and kept on `flask.g`; outside an app context every `get` builds a
+    new instance.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty container.
+        """
+        self._providers = {}  # name -> (provider, lifetime)
+        self._singletons = {}
+        # Reentrant, providers resolve their dependencies while the lock is held
+        self._lock = threading.RLock()
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Replace the lock inherited from the parent process. Singletons handle their own state.
+        """
+        self._lock = threading.RLock()
+
+    def register(self, name, provider, lifetime=SINGLETON):
+        """
+        Register a service, replacing any earlier registration and instance under that name.
+
+        Args:
+            name (str): Name the service is resolved by.
+            provider (callable): Builds the service from the container.
+            lifetime (str): SINGLETON or REQUEST.
+        """
+        if lifetime not in (SINGLETON, REQUEST):
+            raise ValueError(f"Unknown service lifetime: {lifetime}")
+        with self._lock:
+            self._providers[name] = (provider, lifetime)
+            self._singletons.pop(name, None)
+
+    def get(self, name):
+        """
+        Return the instance of a service, building it if this lifetime has none yet.
+
+        Args:
+            name (str): Name of the service.
+
+        Returns:
+            The service.
+
+        Raises:
+            KeyError: If no service is registered under that name.
+        """
+        provider, lifetime = self._providers[name]
+        if lifetime == REQUEST:
+            if not has_app_context():
+                return provider(self)
+            services = g.setdefault("_services", {})
+            if name not in services:
+                services[name] = provider(self)
+            return services[name]
+
+        instance = self._singletons.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._singletons.get(name)
+                if instance is None:
+                    instance = self._singletons[name] = provider(self)
+                    logger.debug(f"Created service {name}.")
+        return instance
+
+    def reset(self, name=None):
+        """
+        Drop the singleton instance of one service, or of every service, so it is built again.
+        """
+        with self._lock:
+            if name is None:
+                self._singletons.clear()
+            else:
+                self._singletons.pop(name, None)
@@ -1,31 +1,210 @@
 from app.services.feature_service import FeatureService
 from app.services.prediction_service import PredictionService
 from app.services.api_client import APIClient
+from app.services.report_job_service import ReportJobService
+from app.services.bulk_report_service import BulkReportService
+from app.services.admin_directory_service import AdminDirectoryService
+from app.services.model_report_service import ModelReportService
 from app.dao.model_dao import ModelDAO
+from app.dao.prediction_history_dao import PredictionHistoryDAO
+from app.factories.service_container import ServiceContainer, SINGLETON
+from app.helpers.cache import ByteCache
+from app.helpers.render_pool import RenderPool
+from app.helpers.pdf_generator import preload_report_resources
+from app.helpers.state_store import StateStore
+from app.helpers.write_behind import WriteBehindBuffer
+from app.helpers.private_dir import app_data_dir
+from app.config import Config
+import os
+
+
+def register_services(container):
+    """
+    Register the services of the application on a container.
+
+    Every service is a singleton, so one ModelDAO, one API client and one set of caches are
+    shared by all services of a worker.
+    """
+    container.register("pdf_cache", lambda c: ByteCache(
+        max_bytes=int(os.getenv("PDF_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+        disk_dir=os.getenv("PDF_CACHE_DIR") or None,
+        disk_max_bytes=int(os.getenv("PDF_CACHE_DISK_MAX_BYTES", 1024 * 1024 * 1024)),
+    ), SINGLETON)
+
+    container.register("plot_cache", lambda c: ByteCache(
+        max_bytes=int(os.getenv("PLOT_CACHE_MAX_BYTES", 16 * 1024 * 1024)),
+        disk_dir=os.getenv("PLOT_CACHE_DIR") or None,
+        disk_max_bytes=int(os.getenv("PLOT_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024)),
+    ), SINGLETON)
+
+    container.register("state_store", lambda c: StateStore(
+        max_bytes=int(os.getenv("STATE_STORE_MAX_BYTES", 8 * 1024 * 1024)),
+        ttl=float(os.getenv("STATE_STORE_TTL", 8 * 3600)),
+        db_path=os.getenv("STATE_STORE_PATH") or os.path.join(app_data_dir(), "state.sqlite3"),
+    ), SINGLETON)
+
+    container.register("render_pool", lambda c: RenderPool(
+        max_workers=int(os.getenv("RENDER_POOL_WORKERS", 2)),
+        max_queue=int(os.getenv("RENDER_POOL_MAX_QUEUE", 8)),
+        job_timeout=float(os.getenv("RENDER_JOB_TIMEOUT", 30)),
+        queue_timeout=float(os.getenv("RENDER_QUEUE_TIMEOUT", 2)),
+        # Workers parse the PDF stylesheet and load fonts once, before their first job
+        initializer=preload_report_resources,
+    ), SINGLETON)
+
+    container.register("model_dao", lambda c: ModelDAO(), SINGLETON)
+    container.register("prediction_history_dao", lambda c: PredictionHistoryDAO(), SINGLETON)
+    container.register("api_client", lambda c: APIClient(), SINGLETON)
+
+    container.register("history_buffer", lambda c: WriteBehindBuffer(
+        c.get("prediction_history_dao").insert_predictions,
+        batch_size=int(os.getenv("HISTORY_BATCH_SIZE", 100)),
+        flush_interval=float(os.getenv("HISTORY_FLUSH_INTERVAL", 2)),
+    ), SINGLETON)
+
+    container.register("model_report_service", lambda c: ModelReportService(c.get("model_dao")), SINGLETON)
+
+    container.register("feature_service", lambda c: FeatureService(
+        c.get("model_dao"),
+        c.get("plot_cache"),
+        Config.CHART_FORMAT,
+        c.get("render_pool"),
+    ), SINGLETON)
+
+    container.register("prediction_service", lambda c: PredictionService(
+        c.get("api_client"), c.get("feature_service"), c.get("history_buffer")
+    ), SINGLETON)
+
+    container.register("report_job_service", _report_job_service, SINGLETON)
+
+    container.register("bulk_report_service", lambda c: BulkReportService(
+        c.get("render_pool"),
+        c.get("pdf_cache"),
+        concurrency=int(os.getenv("BULK_EXPORT_CONCURRENCY", 2)),
+        max_reports=int(os.getenv("BULK_EXPORT_MAX_REPORTS", 100)),
+    ), SINGLETON)
+
+    container.register("admin_directory_service", lambda c: AdminDirectoryService(
+        ttl=float(os.getenv("ADMIN_DIRECTORY_TTL", 60))
+    ), SINGLETON)
+
+
+def _report_job_service(container):
+    job_ttl = float(os.getenv("REPORT_JOB_TTL", 600))
+    job_store = StateStore(
+        max_bytes=0,  # Job status changes in other workers, so always read the shared tier
+        ttl=job_ttl,
+        db_path=os.getenv("REPORT_JOB_STORE_PATH") or os.path.join(app_data_dir(), "report_jobs.sqlite3"),
+    )
+    return ReportJobService(
+        job_store,
+        container.get("render_pool"),
+        container.get("pdf_cache"),
+        result_dir=os.getenv("REPORT_JOB_DIR") or None,
+        max_workers=int(os.getenv("REPORT_JOB_WORKERS", 2)),
+        max_pending=int(os.getenv("REPORT_JOB_MAX_PENDING", 16)),
+        max_jobs_per_user=int(os.getenv("REPORT_JOB_MAX_PER_USER", 2)),
+        job_ttl=job_ttl,
+    )
+
+
+# Process-wide container behind ServiceFactory
+services = ServiceContainer()
+register_services(services)
+
 
 class ServiceFactory:
-    """Factory for creating services and DAOs."""
+    """Factory for creating services and DAOs, resolved from the process-wide service container."""
+
+    container = services
+
+    @staticmethod
+    def create_pdf_cache():
+        """
+        Return the process-wide cache for generated PDF reports.
+        """
+        return ServiceFactory.container.get("pdf_cache")
+
+    @staticmethod
+    def create_state_store():
+        """
+        Return the process-wide server-side store for prediction state.
+        """
+        return ServiceFactory.container.get("state_store")
+
+    @staticmethod
+    def create_render_pool():
+        """
+        Return the process-wide pool of render worker processes.
+        """
+        return ServiceFactory.container.get("render_pool")
+
+    @staticmethod
+    def create_plot_cache():
+        """
+        Return the process-wide cache for rendered contributions plots.
+        """
+        return ServiceFactory.container.get("plot_cache")
 
     @staticmethod
     def create_model_dao():
         """
-        Create and return a ModelDAO instance.
+        Return the shared ModelDAO instance.
+        """
+        return ServiceFactory.container.get("model_dao")
+
+    @staticmethod
+    def create_prediction_history_dao():
+        """
+        Return the shared PredictionHistoryDAO instance.
+        """
+        return ServiceFactory.container.get("prediction_history_dao")
+
+    @staticmethod
+    def create_history_buffer():
+        """
+        Return the process-wide write-behind buffer for the prediction history.
+        """
+        return ServiceFactory.container.get("history_buffer")
+
+    @staticmethod
+    def create_model_report_service():
+        """
+        Return the shared ModelReportService instance.
+        """
+        return ServiceFactory.container.get("model_report_service")
+
+    @staticmethod
+    def create_report_job_service():
+        """
+        Return the shared ReportJobService instance.
+        """
+        return ServiceFactory.container.get("report_job_service")
+
+    @staticmethod
+    def create_bulk_report_service():
+        """
+        Return the shared BulkReportService instance.
+        """
+        return ServiceFactory.container.get("bulk_report_service")
+
+    @staticmethod
+    def create_admin_directory_service():
+        """
+        Return the shared AdminDirectoryService instance.
         """
-        return ModelDAO()
+        return ServiceFactory.container.get("admin_directory_service")
 
     @staticmethod
     def create_feature_service():
         """
-        Create and return a FeatureService instance.
+        Return the shared FeatureService instance.
         """
-        model_dao = ServiceFactory.create_model_dao()
-        return FeatureService(model_dao)
+        return ServiceFactory.container.get("feature_service")
 
     @staticmethod
     def create_prediction_service():
         """
-        Create and return a PredictionService instance.
+        Return the shared PredictionService instance.
         """
-        feature_service = ServiceFactory.create_feature_service()
-        api_client = APIClient()
-        return PredictionService(api_client, feature_service)
\ No newline at end of file
+        return ServiceFactory.container.get("prediction_service")
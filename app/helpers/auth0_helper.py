@@ -1,13 +1,140 @@
+import logging
+import math
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from app.helpers import fork_safety
 
-def get_management_api_token():
-    """Retrieves the management api token from Auth0."""
+logger = logging.getLogger(__name__)
+
+APPROVED_QUERY = "app_metadata.approved:true"
+PENDING_QUERY = "app_metadata.approved:false"
+
+# Retries of Management API requests answered with 429 Too Many Requests
+MAX_RETRIES = int(os.getenv("AUTH0_MAX_RETRIES", 3))
+MAX_RETRY_DELAY = 10
+
+# Keep-alive connections to Auth0 shared by every helper in this process
+auth0_session = requests.Session()
+
+
+def _mount_adapters(session):
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=int(os.getenv("AUTH0_POOL_SIZE", 10))))
+    session.mount("http://", HTTPAdapter())
+
+
+_mount_adapters(auth0_session)
+
+
+@fork_safety.register_function
+def _reset_session_after_fork():
+    """Replaces the connection pools of the Auth0 session, their sockets belong to the parent process."""
+    _mount_adapters(auth0_session)
+
+
+def auth0_base_url():
+    """
+    Base URL of the Auth0 tenant. AUTH0_BASE_URL points the app at another server, such as the
+    local stand-in in benchmarks/fake_auth0.py.
+    """
+    return (os.getenv("AUTH0_BASE_URL") or f"https://{os.getenv('AUTH0_DOMAIN')}").rstrip("/")
+
+
+class ManagementTokenCache:
+    """
+    Caches the Management API token until shortly before it expires.
+
+    Once a token enters its last `refresh_ahead` seconds, one background thread fetches the next
+    token while callers keep using the current one. Callers only wait for Auth0 when there is no
+    valid token at all, and then a single caller fetches it while the others wait on the lock.
+    """
+
+    def __init__(self, fetch_token, refresh_ahead=300, expiry_margin=30):
+        """
+        Initialize the cache.
+
+        Args:
+            fetch_token (callable): Returns a new (access token, expires_in seconds) tuple.
+            refresh_ahead (float): Seconds before expiry at which the token is refreshed in the background.
+            expiry_margin (float): Seconds before expiry after which the token is no longer handed out.
+        """
+        self.fetch_token = fetch_token
+        self.refresh_ahead = refresh_ahead
+        self.expiry_margin = expiry_margin
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # Held by the background refresh, never waited on
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Replace the locks inherited from the parent process. The cached token stays valid.
+        """
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def get(self):
+        """
+        Return a valid token, fetching one only if none is cached.
+        """
+        now = time.monotonic()
+        token, expires_at = self._token, self._expires_at
+        if token and now < expires_at - self.expiry_margin:
+            if now >= expires_at - self.refresh_ahead:
+                self._refresh_in_background()
+            return token
+
+        with self._lock:
+            # Another caller may have fetched the token while this one waited
+            if self._token and time.monotonic() < self._expires_at - self.expiry_margin:
+                return self._token
+            return self._refresh()
+
+    def invalidate(self):
+        """
+        Drop the cached token, the next call fetches a new one.
+        """
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+    def _refresh(self):
+        token, expires_in = self.fetch_token()
+        self._token, self._expires_at = token, time.monotonic() + expires_in
+        return token
+
+    def _refresh_in_background(self):
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # Another thread is already refreshing
+        try:
+            threading.Thread(target=self._background_refresh, name="auth0-token-refresh", daemon=True).start()
+        except Exception:
+            self._refresh_lock.release()
+            raise
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                self._refresh()
+        except Exception as e:
+            # The current token stays in use, the next call past the margin fetches synchronously
+            logger.warning(f"Failed to refresh the Management API token: {e}")
+        finally:
+            self._refresh_lock.release()
+
+
+def _fetch_management_api_token():
+    """Requests a new Management API token from Auth0 with the client credentials grant."""
     domain = os.getenv("AUTH0_DOMAIN")
     client_id = os.getenv("MGMT_API_CLIENT_ID")
     client_secret = os.getenv("MGMT_API_CLIENT_SECRET")
     audience = f"https://{domain}/api/v2/"
-    token_url = f"https://{domain}/oauth/token"
+    token_url = f"{auth0_base_url()}/oauth/token"
 
     data = {
         "client_id": client_id,
@@ -16,10 +143,134 @@ def get_management_api_token():
         "grant_type": "client_credentials"
     }
 
-    response = requests.post(token_url, json=data)
+    response = auth0_session.post(token_url, json=data)
     response.raise_for_status()  # Raise an error if the request fails
-    token = response.json().get("access_token")
-    return token
+    payload = response.json()
+    return payload.get("access_token"), payload.get("expires_in", 86400)
+
+
+management_token_cache = ManagementTokenCache(
+    _fetch_management_api_token,
+    refresh_ahead=float(os.getenv("AUTH0_TOKEN_REFRESH_AHEAD", 300)),
+)
+
+
+def get_management_api_token():
+    """Retrieves the management api token from Auth0, cached until shortly before it expires."""
+    return management_token_cache.get()
+
+
+def _invalidate_rejected_token(response, *args, **kwargs):
+    """Drops the cached token when the Management API rejects it, e.g. after it was revoked."""
+    if response.status_code == 401 and "/api/v2/" in response.url:
+        management_token_cache.invalidate()
+
+
+auth0_session.hooks["response"].append(_invalidate_rejected_token)
+
+
+def _retry_delay(response, attempt):
+    """Seconds to wait before retrying a rate limited request, from Auth0's rate limit headers."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        delay = int(retry_after)
+    elif response.headers.get("X-RateLimit-Reset", "").isdigit():
+        delay = int(response.headers["X-RateLimit-Reset"]) - time.time()
+    else:
+        delay = 2 ** attempt
+    return min(max(delay, 0.1), MAX_RETRY_DELAY)
+
+
+def management_request(method, url, **kwargs):
+    """
+    Send a request to the Auth0 Management API, waiting and retrying when it is rate limited.
+
+    Args:
+        method (str): HTTP method.
+        url (str): Request URL.
+        **kwargs: Arguments for requests.Session.request.
+
+    Returns:
+        requests.Response: The response, raise_for_status has been called on it.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        response = auth0_session.request(method, url, **kwargs)
+        if response.status_code != 429 or attempt == MAX_RETRIES:
+            break
+        delay = _retry_delay(response, attempt)
+        logger.warning(f"Auth0 rate limit reached, retrying {method} {url} in {delay:.1f} s.")
+        time.sleep(delay)
+    response.raise_for_status()
+    return response
+
+
+# Auth0's user search only pages through the first 1000 results and answers 400 past them
+SEARCH_RESULT_LIMIT = 1000
+
+
+def searchable_pages(total, per_page, query=""):
+    """
+    Return the number of pages of a user search that Auth0 serves.
+
+    Logs a warning when the search matches more users than Auth0 lets through.
+    """
+    pages = math.ceil(total / per_page)
+    max_pages = SEARCH_RESULT_LIMIT // per_page
+    if pages > max_pages:
+        logger.warning(f"Auth0 search '{query}' matches {total} users, only the first {max_pages * per_page} can be listed.")
+        return max_pages
+    return pages
+
+
+def get_users_page(query, token, page=0, per_page=50):
+    """
+    Fetch one page of the users matching a search query.
+
+    Returns:
+        dict: The page's "users" and the "total" number of matching users.
+    """
+    url = f"{auth0_base_url()}/api/v2/users"
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"q": query, "search_engine": "v3", "page": page, "per_page": per_page, "include_totals": "true"}
+    response = management_request("GET", url, headers=headers, params=params)
+    return response.json()
+
+
+def iter_users(query, token, per_page=100, prefetch=int(os.getenv("AUTH0_PAGE_PREFETCH", 3))):
+    """
+    Iterate over every user matching a search query, page by page.
+
+    The first page tells how many pages there are; the following pages are requested ahead
+    with at most `prefetch` requests in flight, and users are yielded in page order. Auth0
+    returns at most the first 1000 results of a search, later users are not yielded.
+
+    Args:
+        query (str): Lucene query on the users, e.g. 'app_metadata.approved:true'.
+        token (str): Management API token.
+        per_page (int): Users per page, at most 100.
+        prefetch (int): Maximum number of pages requested at the same time.
+
+    Yields:
+        dict: One user at a time.
+    """
+    first = get_users_page(query, token, 0, per_page)
+    yield from first["users"]
+    pages = searchable_pages(first.get("total", 0), per_page, query)
+    if pages <= 1:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, prefetch), thread_name_prefix="auth0-pages") as executor:
+        requested = deque()
+        next_page = 1
+        while next_page < pages or requested:
+            while next_page < pages and len(requested) < max(1, prefetch):
+                requested.append(executor.submit(get_users_page, query, token, next_page, per_page))
+                next_page += 1
+            users = requested.popleft().result()["users"]
+            if not users:
+                # The tenant shrank while paging, later pages are empty as well
+                break
+            yield from users
 
 
 def get_pending_approvals():
@@ -27,23 +278,47 @@ def get_pending_approvals():
     Fetch users from Auth0 whose app_metadata.approved is false.
     Uses the Auth0 Management API with a query filter.
     """
-    domain = os.getenv("AUTH0_DOMAIN")
     token = get_management_api_token()
-    query = 'app_metadata.approved:false'
-    url = f"https://{domain}/api/v2/users?q={query}&search_engine=v3"
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
+    return list(iter_users(PENDING_QUERY, token))
+
+
+def get_roles(token):
+    """Fetch all roles defined in the Auth0 tenant."""
+    url = f"{auth0_base_url()}/api/v2/roles"
+    headers = {"Authorization": f"Bearer {token}"}
+    response = management_request("GET", url, headers=headers)
+    return response.json()
+
+
+def get_role_users(role_id, token, per_page=100):
+    """
+    Fetch every user assigned to a role, one page of `per_page` users at a time.
+    """
+    url = f"{auth0_base_url()}/api/v2/roles/{role_id}/users"
+    headers = {"Authorization": f"Bearer {token}"}
+    users = []
+    page = 0
+    while True:
+        response = management_request("GET", url, headers=headers, params={"page": page, "per_page": per_page})
+        batch = response.json()
+        users.extend(batch)
+        if len(batch) < per_page:
+            return users
+        page += 1
+
+
+def get_user_roles(user_id, token):
+    """Fetch the roles assigned to a single user based on the Auth0 user id."""
+    url = f"{auth0_base_url()}/api/v2/users/{user_id}/roles"
+    headers = {"Authorization": f"Bearer {token}"}
+    response = management_request("GET", url, headers=headers)
     return response.json()
 
 
 def update_user_approval(user_id, approval_status):
     """Update a user's approval status via the Auth0 Management API based on the Auth0 user id."""
-    domain = os.getenv("AUTH0_DOMAIN")
     token = get_management_api_token()
-    url = f"https://{domain}/api/v2/users/{user_id}"
+    url = f"{auth0_base_url()}/api/v2/users/{user_id}"
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
@@ -51,23 +326,21 @@ def update_user_approval(user_id, approval_status):
     data = {
         "app_metadata": {"approved": approval_status}
     }
-    response = requests.patch(url, json=data, headers=headers)
-    response.raise_for_status()
+    response = management_request("PATCH", url, json=data, headers=headers)
     return response.json()
 
 
 def delete_user(user_id):
     """Delete a user from Auth0 based on the Auth0 user id."""
-    domain = os.getenv("AUTH0_DOMAIN")
     token = get_management_api_token()
-    url = f"https://{domain}/api/v2/users/{user_id}"
+    url = f"{auth0_base_url()}/api/v2/users/{user_id}"
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
     }
-    response = requests.delete(url, headers=headers)
-    response.raise_for_status()  # Will raise an exception if the delete fails
-    return response.json()
+    response = management_request("DELETE", url, headers=headers)  # Will raise an exception if the delete fails
+    # Auth0 answers a successful delete with 204 No Content
+    return response.json() if response.content else None
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from app.helpers import fork_safety
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(*parts):
+    """
+    Build a stable content hash for the given JSON-serialisable parts.
+
+    Args:
+        *parts: Values that together identify the cached content.
+
+    Returns:
+        str: Hex SHA-256 digest of the canonical JSON encoding of the parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ByteCache:
+    """
+    Two-tier cache for rendered binary content.
+
+    The memory tier is an LRU bounded by the total number of cached bytes. The
+    optional disk tier stores one file per key in a directory that can be shared
+    by every worker on the host, so a render done in one worker is reused by the others.
+    """
+
+    def __init__(self, max_bytes, disk_dir=None, disk_max_bytes=None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes (int): Upper bound for the memory tier, in bytes.
+            disk_dir (str): Optional directory for the shared disk tier.
+            disk_max_bytes (int): Optional upper bound for the disk tier, in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        fork_safety.register(self)
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def after_fork(self):
+        """
+        Replace the locks inherited from the parent process, which may have been held at fork time.
+        """
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key):
+        """
+        Return the cached bytes for a key, or None when it is not cached.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store_memory(key, value)
+        return value
+
+    def put(self, key, value):
+        """
+        Store bytes under a key in both tiers.
+        """
+        with self._lock:
+            self._store_memory(key, value)
+        self._write_disk(key, value)
+
+    def get_or_create(self, key, create):
+        """
+        Return the cached bytes for a key, calling `create` to produce them on a miss.
+
+        Concurrent callers asking for the same key wait for a single `create` call.
+
+        Args:
+            key (str): Cache key.
+            create (callable): Zero-argument callable returning bytes.
+
+        Returns:
+            bytes: The cached or newly created content.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key)
+                if value is None:
+                    value = create()
+                    self.put(key, value)
+                return value
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def invalidate(self, key):
+        """
+        Remove a key from both tiers.
+        """
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self.current_bytes -= len(value)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """
+        Drop every entry from the memory tier.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _store_memory(self, key, value):
+        """Insert into the memory tier and evict least recently used entries. Caller holds the lock."""
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= len(previous)
+        self._entries[key] = value
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key)
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = f.read()
+            os.utime(path)  # Track recency for disk eviction
+            return value
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read cache entry {key}: {e}")
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        try:
+            # Write to a temporary file and rename so other workers never read partial entries
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, self._disk_path(key))
+            self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key}: {e}")
+
+    def _evict_disk(self):
+        """Remove least recently used files until the disk tier fits its byte budget."""
+        if not self.disk_max_bytes:
+            return
+        entries = []
+        total = 0
+        with os.scandir(self.disk_dir) as it:
+            for entry in it:
+                if entry.name.startswith(".tmp-") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.disk_max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.disk_max_bytes:
+                break
@@ -0,0 +1,175 @@
+import math
+import os
+from io import BytesIO
+from jinja2 import Environment, FileSystemLoader
+# Loaded on first use, so workers serving SVG charts never import matplotlib
+from app.helpers.lazy_imports import pyplot as plt
+from app.helpers.template_cache import bytecode_cache
+
+POSITIVE_COLOR = "#E73C0D"
+NEGATIVE_COLOR = "#0090A5"
+
+CHART_MIMETYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+# Figure size of the matplotlib chart (8x6 inches at 100 dpi)
+SVG_WIDTH = 800
+SVG_HEIGHT = 600
+
+_svg_env = None
+
+
+def _get_svg_env():
+    """Return the Jinja environment for chart templates, which works outside an app context."""
+    global _svg_env
+    if _svg_env is None:
+        templates_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "charts")
+        _svg_env = Environment(loader=FileSystemLoader(templates_dir), autoescape=True, bytecode_cache=bytecode_cache())
+    return _svg_env
+
+
+def _sorted_contributions(contributions):
+    """Sort contributions by absolute importance, largest first."""
+    sorted_contributions = sorted(contributions.items(), key=lambda x: abs(x[1]), reverse=True)
+    features = [feature for feature, _ in sorted_contributions]
+    importances = [importance for _, importance in sorted_contributions]
+    return features, importances
+
+
+def _x_limits(importances):
+    """Axis limits matching the matplotlib chart."""
+    min_importance = min(importances)
+    max_importance = max(importances)
+    return (
+        min_importance * 1.2 if min_importance < 0 else 0,
+        max_importance * 1.2 if max_importance > 0 else 0,
+    )
+
+
+def _title(prediction):
+    return f"Feature Contributions (Prediction: {'Disease' if prediction == 1 else 'No Disease'})"
+
+
+def _nice_ticks(lower, upper, max_ticks=8):
+    """Return evenly spaced, rounded tick values within [lower, upper]."""
+    span = upper - lower
+    raw_step = span / max_ticks
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw_step)
+    first = math.ceil(lower / step - 1e-9) * step
+    ticks = []
+    value = first
+    while value <= upper + step * 1e-9:
+        ticks.append(round(value, 10) + 0.0)
+        value += step
+    return ticks
+
+
+def _format_tick(value):
+    return f"{value:g}".replace("-", "−")
+
+
+def render_contributions(contributions: dict, prediction: int, chart_format: str = "png") -> bytes:
+    """
+    Render the feature contributions chart in the requested format.
+
+    Args:
+        contributions: Mapping of feature name to (bias-adjusted) importance.
+        prediction: The predicted class.
+        chart_format: Either "png" or "svg".
+
+    Returns:
+        bytes: The rendered chart.
+    """
+    if chart_format == "svg":
+        return render_contributions_svg(contributions, prediction)
+    if chart_format == "png":
+        return render_contributions_png(contributions, prediction)
+    raise ValueError(f"Unsupported chart format: {chart_format}")
+
+
+def render_contributions_png(contributions: dict, prediction: int) -> bytes:
+    """Render the feature contributions chart as a PNG using matplotlib."""
+    features, importances = _sorted_contributions(contributions)
+
+    # Create the plot
+    fig, ax = plt.subplots(figsize=(8, 6))
+    bars = ax.barh(features, importances, color=[POSITIVE_COLOR if imp > 0 else NEGATIVE_COLOR for imp in importances])
+    ax.invert_yaxis()
+    ax.set_xlabel("Importance")
+    ax.set_title(_title(prediction))
+
+    # Add annotations to bars
+    for bar, importance in zip(bars, importances):
+        ax.text(
+            bar.get_width() + (0.002 if importance > 0 else -0.002),
+            bar.get_y() + bar.get_height() / 2,
+            f"{importance:.2f}",
+            va="center",
+            ha="left" if importance > 0 else "right",
+            fontsize=10,
+            color="black"
+        )
+
+    ax.set_xlim(*_x_limits(importances))
+
+    # Save the plot to a BytesIO buffer
+    buffer = BytesIO()
+    plt.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_contributions_svg(contributions: dict, prediction: int) -> bytes:
+    """Render the feature contributions chart as SVG from a template, without matplotlib."""
+    features, importances = _sorted_contributions(contributions)
+    x_min, x_max = _x_limits(importances)
+    if x_max == x_min:
+        x_max = x_min + 1
+
+    # Leave room on the left for the longest feature label (~6px per character at 10px)
+    left = 20 + 6 * max(len(feature) for feature in features)
+    plot = {"left": left, "top": 40, "right": SVG_WIDTH - 20, "bottom": SVG_HEIGHT - 50}
+    plot["width"] = plot["right"] - plot["left"]
+    plot["height"] = plot["bottom"] - plot["top"]
+    plot["center"] = plot["left"] + plot["width"] / 2
+
+    def to_x(value):
+        return plot["left"] + (value - x_min) / (x_max - x_min) * plot["width"]
+
+    # Matplotlib bars are 0.8 high on unit slots with 0.5 padding at both ends of the axis
+    slot = plot["height"] / (len(features) - 1 + 2 * 0.5 + 0.2)
+    zero_x = to_x(0)
+    bars = []
+    for index, (feature, importance) in enumerate(zip(features, importances)):
+        center = plot["top"] + (index + 0.6) * slot
+        end_x = to_x(importance)
+        bars.append({
+            "feature": feature,
+            "x": round(min(zero_x, end_x), 2),
+            "width": round(abs(end_x - zero_x), 2),
+            "y": round(center - 0.4 * slot, 2),
+            "height": round(0.8 * slot, 2),
+            "center": round(center, 2),
+            "color": POSITIVE_COLOR if importance > 0 else NEGATIVE_COLOR,
+            "label": f"{importance:.2f}",
+            "label_x": round(end_x + (3 if importance > 0 else -3), 2),
+            "label_anchor": "start" if importance > 0 else "end",
+        })
+
+    x_ticks = [
+        {"x": round(to_x(value), 2), "label": _format_tick(value)}
+        for value in _nice_ticks(x_min, x_max)
+    ]
+
+    svg = _get_svg_env().get_template("contributions.svg").render(
+        width=SVG_WIDTH,
+        height=SVG_HEIGHT,
+        title=_title(prediction),
+        plot=plot,
+        bars=bars,
+        x_ticks=x_ticks,
+    )
+    return svg.encode("utf-8")
@@ -0,0 +1,50 @@
+import logging
+import os
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Objects with an after_fork method and module-level reset functions, see reinitialize_after_fork
+_objects = weakref.WeakSet()
+_functions = []
+
+
+def register(obj):
+    """
+    Register an object whose `after_fork` method resets its process-local state in a forked worker.
+
+    Objects are held weakly, so registering does not keep them alive.
+
+    Returns:
+        The object.
+    """
+    _objects.add(obj)
+    return obj
+
+
+def register_function(fn):
+    """
+    Register a module-level function that resets process-local state in a forked worker.
+
+    Returns:
+        callable: The function, so this can be used as a decorator.
+    """
+    _functions.append(fn)
+    return fn
+
+
+def reinitialize_after_fork():
+    """
+    Reset the state a forked worker must not share with the process it was forked from.
+
+    When gunicorn preloads the app, the workers are forked from a master that already built every
+    service. Locks that were held at fork time stay held forever in the child, background threads
+    do not exist there, and database connections and keep-alive HTTP sockets would be shared with
+    the master and the other workers. Called from gunicorn's post_fork hook in each worker.
+    """
+    for fn in list(_functions):
+        fn()
+    objects = list(_objects)
+    for obj in objects:
+        obj.after_fork()
+    logger.info(f"Re-initialized {len(_functions)} modules and {len(objects)} services in worker {os.getpid()}.")
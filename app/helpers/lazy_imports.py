@@ -0,0 +1,44 @@
+import importlib
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module stand-in that imports the real module when one of its attributes is first accessed.
+
+    pandas and matplotlib take hundreds of milliseconds and tens of MB to import. Modules that
+    need them import the facades below instead, so a worker only loads them once a request
+    actually uses them:
+
+        from app.helpers.lazy_imports import pandas as pd
+    """
+
+    def __init__(self, name):
+        """
+        Initialize LazyModule.
+
+        Args:
+            name (str): Full name of the module to import.
+        """
+        super().__init__(name)
+        self._lazy_module = None
+        self._lazy_lock = threading.Lock()
+
+    def _load(self):
+        if self._lazy_module is None:
+            with self._lazy_lock:
+                if self._lazy_module is None:
+                    self._lazy_module = importlib.import_module(self.__name__)
+        return self._lazy_module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+# Facades of the heavy dependencies
+pandas = LazyModule("pandas")
+pyplot = LazyModule("matplotlib.pyplot")
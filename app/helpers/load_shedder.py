@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+from functools import wraps
+from flask import request
+from werkzeug.exceptions import ServiceUnavailable
+from app.helpers import fork_safety
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(ServiceUnavailable):
+    """Raised when a request is shed, rendered as the 503 page with a Retry-After header."""
+
+
+class LoadShedder:
+    """
+    Concurrency limit for one route that sheds requests which would only queue up.
+
+    At most `max_concurrent` requests run at a time. The shedder also keeps an exponentially
+    weighted moving average of how long admitted requests take, which follows the latency of the
+    prediction API or WeasyPrint behind the route. A new request is rejected right away when the
+    expected wait, the requests already in flight times that average, exceeds `max_wait`. When
+    the upstream slows down the route therefore admits fewer requests, and it recovers as faster
+    responses lower the average. A request is always admitted when nothing is in flight, so the
+    average keeps being updated.
+    """
+
+    def __init__(self, name, max_concurrent=4, max_wait=10.0, alpha=0.2, methods=None):
+        """
+        Initialize the shedder.
+
+        Args:
+            name (str): Name used in log messages.
+            max_concurrent (int): Maximum number of requests running at a time.
+            max_wait (float): Maximum expected wait in seconds before a request is shed.
+            alpha (float): Weight of the latest latency in the moving average.
+            methods (tuple): HTTP methods that pass through the shedder, all methods when None.
+        """
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_wait = max_wait
+        self.alpha = alpha
+        self.methods = methods
+        self.in_flight = 0
+        self.latency = None  # Moving average in seconds, None until the first request finishes
+        self.shed = 0
+        self._lock = threading.Lock()
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Reset the in-flight count and lock, the parent's requests do not run in this process.
+        """
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def expected_wait(self):
+        """Return the seconds a new request is expected to wait behind the ones in flight."""
+        return (self.in_flight / self.max_concurrent) * (self.latency or 0)
+
+    def acquire(self):
+        """
+        Admit a request.
+
+        Raises:
+            Overloaded: If the route is at its concurrency limit or the expected wait is too long.
+        """
+        with self._lock:
+            if self.in_flight and (self.in_flight >= self.max_concurrent or self.expected_wait() > self.max_wait):
+                self.shed += 1
+                retry_after = max(1, round(self.latency or 1))
+                logger.warning(f"Shedding {self.name} request: {self.in_flight} in flight, "
+                               f"average latency {self.latency or 0:.2f}s.")
+                raise Overloaded(retry_after=retry_after)
+            self.in_flight += 1
+
+    def release(self, duration):
+        """
+        Mark an admitted request as finished.
+
+        Args:
+            duration (float): Seconds the request took.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self.latency = duration if self.latency is None else self.alpha * duration + (1 - self.alpha) * self.latency
+
+    def __call__(self, f):
+        """Decorate a view so that its requests pass through the shedder."""
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if self.methods and request.method not in self.methods:
+                return f(*args, **kwargs)
+            self.acquire()
+            start = time.monotonic()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                self.release(time.monotonic() - start)
+        return wrapper
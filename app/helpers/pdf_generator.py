@@ -1,16 +1,326 @@
-from weasyprint import HTML
-from flask import render_template
+import base64
+import logging
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit
+from flask import current_app, render_template, request
+from app.helpers import fork_safety
+from app.helpers.cache import content_key
 
-def generate_pdf(report):
+logger = logging.getLogger(__name__)
+
+# Part of the PDF cache key. Bump it whenever pdf_report.html, its stylesheet or the report sections change.
+PDF_TEMPLATE_VERSION = "5"
+
+PDF_STYLESHEET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "css", "pdf_report.css")
+
+# Stylesheets and font configuration shared by every render in this process, see report_resources
+_report_resources = None
+_report_resources_lock = threading.Lock()
+
+# Laid out model pages, keyed by model_document_key, at most MODEL_DOCUMENT_CACHE_SIZE of them
+MODEL_DOCUMENT_CACHE_SIZE = 8
+_model_documents = OrderedDict()
+_model_documents_lock = threading.Lock()
+
+# Static files read by LocalURLFetcher, keyed by path, holding (mtime, bytes)
+_static_file_cache = {}
+_static_file_lock = threading.Lock()
+
+
+@fork_safety.register_function
+def _reset_locks_after_fork():
+    """Replaces the cache locks inherited from the parent process, which may have been held at fork time."""
+    global _report_resources_lock, _model_documents_lock, _static_file_lock
+    _report_resources_lock = threading.Lock()
+    _model_documents_lock = threading.Lock()
+    _static_file_lock = threading.Lock()
+
+
+class LocalURLFetcher:
+    """
+    WeasyPrint url_fetcher that never makes HTTP requests back to this application.
+
+    Data URLs are decoded in memory and URLs pointing at the app's static files are read from
+    disk through an in-process cache. Anything else is handed to WeasyPrint's default fetcher.
+    The time spent fetching is accumulated in `fetch_time`.
+    """
+
+    def __init__(self, static_folder, static_url_path="/static", base_url=None):
+        """
+        Initialize the fetcher.
+
+        Args:
+            static_folder (str): Directory holding the app's static files.
+            static_url_path (str): URL path under which static files are served.
+            base_url (str): Base URL of the report, only static URLs on this host are read from disk.
+        """
+        self.static_folder = os.path.realpath(static_folder)
+        self.static_prefix = static_url_path.rstrip("/") + "/"
+        self.host = urlsplit(base_url).netloc if base_url else None
+        self.fetch_time = 0.0
+        self.fetch_count = 0
+
+    def __call__(self, url, timeout=10, ssl_context=None):
+        start = time.perf_counter()
+        try:
+            return self._fetch(url, timeout, ssl_context)
+        finally:
+            self.fetch_time += time.perf_counter() - start
+            self.fetch_count += 1
+
+    def _fetch(self, url, timeout, ssl_context):
+        if url.startswith("data:"):
+            return self._fetch_data_url(url)
+
+        parts = urlsplit(url)
+        if parts.scheme == "file":
+            # URLs relative to the report stylesheet resolve to files in the static folder
+            path = self._static_path(os.path.relpath(unquote(parts.path), self.static_folder))
+            if path:
+                return self._fetch_static_file(path, url)
+        is_local = parts.scheme == "file" or (parts.scheme in ("http", "https") and parts.netloc == self.host)
+        if is_local and parts.path.startswith(self.static_prefix):
+            path = self._static_path(unquote(parts.path[len(self.static_prefix):]))
+            if path:
+                return self._fetch_static_file(path, url)
+
+        from weasyprint import default_url_fetcher
+
+        logger.warning(f"Fetching {url} over the network while generating a PDF.")
+        return default_url_fetcher(url, timeout=timeout, ssl_context=ssl_context)
+
+    def _fetch_static_file(self, path, url):
+        return {
+            "string": _read_static_file(path),
+            "mime_type": mimetypes.guess_type(path)[0] or "application/octet-stream",
+            "redirected_url": url,
+        }
+
+    def _fetch_data_url(self, url):
+        header, _, data = url[len("data:"):].partition(",")
+        mime_type, _, encoding = header.partition(";")
+        payload = base64.b64decode(data) if encoding == "base64" else unquote(data).encode("utf-8")
+        return {"string": payload, "mime_type": mime_type or "text/plain", "redirected_url": url}
+
+    def _static_path(self, relative_path):
+        """Resolve a path inside the static folder, refusing paths that escape it."""
+        path = os.path.realpath(os.path.join(self.static_folder, relative_path))
+        if not path.startswith(self.static_folder + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+
+
+def _read_static_file(path):
+    """Return the contents of a static file, reading it from disk only when it changed."""
+    mtime = os.path.getmtime(path)
+    with _static_file_lock:
+        cached = _static_file_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        data = f.read()
+    with _static_file_lock:
+        _static_file_cache[path] = (mtime, data)
+    return data
+
+
+def report_resources():
+    """
+    Return the parsed report stylesheets and the font configuration for this process.
+
+    Parsing the CSS and discovering fonts is the fixed cost of every PDF, so both are built once
+    and reused by all later renders. The stylesheet is parsed again when the file changes.
+
+    Returns:
+        tuple: (list of weasyprint.CSS, weasyprint FontConfiguration)
+    """
+    global _report_resources
+
+    mtime = os.path.getmtime(PDF_STYLESHEET)
+    with _report_resources_lock:
+        if _report_resources is None or _report_resources[0] != mtime:
+            from weasyprint import CSS
+            from weasyprint.text.fonts import FontConfiguration
+
+            start = time.perf_counter()
+            font_config = _report_resources[2] if _report_resources else FontConfiguration()
+            stylesheets = [CSS(filename=PDF_STYLESHEET, font_config=font_config)]
+            _report_resources = (mtime, stylesheets, font_config)
+            logger.info(f"Loaded PDF stylesheets in {(time.perf_counter() - start) * 1000:.0f} ms.")
+        return _report_resources[1], _report_resources[2]
+
+
+def preload_report_resources():
+    """
+    Build the report stylesheets and fonts ahead of the first render. Used as the render pool's
+    worker initializer, so the cost is paid when a worker starts instead of on a download.
+    """
+    try:
+        report_resources()
+    except Exception as e:
+        # The first render retries and reports the error to the user
+        logger.warning(f"Failed to preload PDF resources: {e}")
+
+
+def render_report_html(report):
+    """
+    Render the HTML of the PDF report. Needs an active request context.
+
+    Args:
+        report (Report): The report object containing sections.
+
+    Returns:
+        str: The report HTML.
+    """
+    return render_template("pdf_report.html", report=report.get_sections())
+
+
+def pdf_render_options():
+    """
+    Return the keyword arguments html_to_pdf needs to resolve the report's URLs locally.
+    Needs an active request context.
+    """
+    return {
+        "base_url": request.url_root,
+        "static_folder": current_app.static_folder,
+        "static_url_path": current_app.static_url_path,
+    }
+
+
+def render_model_report_html(sections):
+    """
+    Render the HTML of the model pages appended to every PDF report. Needs an active request context.
+
+    Args:
+        sections (list): The model sections, see ModelReportService.
+
+    Returns:
+        str: The model report HTML.
+    """
+    return render_template("pdf_model_report.html", report=sections)
+
+
+def model_document_key(model_name, version):
+    """
+    Return the key under which render workers cache the laid out model pages, or None if the
+    model has no version and its pages cannot be cached. Needs an active request context.
+    """
+    if version is None:
+        return None
+    # Plot URLs are absolute, so the pages depend on the host the app is served on
+    return content_key("model_document", model_name, version, request.url_root, PDF_TEMPLATE_VERSION)
+
+
+def _layout(html_content, base_url, url_fetcher, stylesheets, font_config):
+    from weasyprint import HTML
+
+    if url_fetcher:
+        html = HTML(string=html_content, base_url=base_url, url_fetcher=url_fetcher)
+    else:
+        html = HTML(string=html_content, base_url=base_url)
+    return html.render(stylesheets=stylesheets, font_config=font_config)
+
+
+def _model_document(model_key, model_html, layout):
+    """Return the laid out model pages, laying them out only once per key in this process."""
+    if model_key is not None:
+        with _model_documents_lock:
+            document = _model_documents.get(model_key)
+            if document is not None:
+                _model_documents.move_to_end(model_key)
+                return document
+
+    document = layout(model_html)
+    if model_key is not None:
+        with _model_documents_lock:
+            _model_documents[model_key] = document
+            while len(_model_documents) > MODEL_DOCUMENT_CACHE_SIZE:
+                _model_documents.popitem(last=False)
+    return document
+
+
+def html_to_pdf(html_content, base_url=None, static_folder=None, static_url_path="/static",
+                model_html=None, model_key=None):
+    """
+    Lay out report HTML and write it as a PDF. Runs without an app context, so it can be
+    submitted to the render pool.
+
+    The model pages are the same for every prediction on a model version. They are laid out
+    once per process and `model_key`, then appended to the prediction pages.
+
+    Args:
+        html_content (str): The report HTML.
+        base_url (str): Base URL used to resolve relative links in the HTML.
+        static_folder (str): The app's static folder, static URLs are read from here instead of over HTTP.
+        static_url_path (str): URL path under which static files are served.
+        model_html (str): Optional HTML of the model pages, see render_model_report_html.
+        model_key (str): Cache key of the model pages, see model_document_key. None disables caching.
+
+    Returns:
+        bytes: The generated PDF content.
+    """
+    stylesheets, font_config = report_resources()
+    url_fetcher = LocalURLFetcher(static_folder, static_url_path, base_url) if static_folder else None
+
+    def layout(html):
+        return _layout(html, base_url, url_fetcher, stylesheets, font_config)
+
+    start = time.perf_counter()
+    document = layout(html_content)
+    if model_html is not None:
+        model_document = _model_document(model_key, model_html, layout)
+        document = document.copy(document.pages + model_document.pages)
+    laid_out = time.perf_counter()
+
+    pdf = document.write_pdf()
+    written = time.perf_counter()
+
+    fetch_time = url_fetcher.fetch_time if url_fetcher else 0.0
+    logger.info(
+        f"PDF generated in {(written - start) * 1000:.0f} ms: "
+        f"fetch {fetch_time * 1000:.0f} ms ({url_fetcher.fetch_count if url_fetcher else 0} resources), "
+        f"layout {(laid_out - start - fetch_time) * 1000:.0f} ms, "
+        f"write {(written - laid_out) * 1000:.0f} ms"
+    )
+    return pdf
+
+
+def pdf_render_job(report, model_sections=None, model_key=None):
+    """
+    Render the HTML of a report and collect the html_to_pdf arguments. Needs an active request context.
+
+    Args:
+        report (Report): The prediction sections of the report.
+        model_sections (list): Optional model sections, appended as separately cached pages.
+        model_key (str): Cache key of the model pages, see model_document_key.
+
+    Returns:
+        tuple: (report HTML, keyword arguments for html_to_pdf)
+    """
+    render_options = pdf_render_options()
+    if model_sections is not None:
+        render_options.update(model_html=render_model_report_html(model_sections), model_key=model_key)
+    return render_report_html(report), render_options
+
+
+def generate_pdf(report, render_pool=None, model_sections=None, model_key=None):
     """
     Generate a PDF from the given report object.
 
     Args:
         report (Report): The report object containing sections.
+        render_pool (RenderPool): Optional pool that runs the WeasyPrint layout off the request thread.
+        model_sections (list): Optional model sections, appended as separately cached pages.
+        model_key (str): Cache key of the model pages, see model_document_key.
 
     Returns:
         bytes: The generated PDF content.
     """
-    html_content = render_template("pdf_report.html", report=report.get_sections())
-    pdf = HTML(string=html_content).write_pdf()
-    return pdf
\ No newline at end of file
+    html_content, render_options = pdf_render_job(report, model_sections, model_key)
+    if render_pool is None:
+        return html_to_pdf(html_content, **render_options)
+    return render_pool.run(html_to_pdf, html_content, **render_options)
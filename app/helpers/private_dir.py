@@ -0,0 +1,37 @@
+import logging
+import os
+import stat
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+def app_data_dir():
+    """
+    Return the directory for the files the workers share, creating it if needed.
+
+    The state store and the report jobs keep prediction data here, so the directory must only be
+    accessible to this user. It is APP_DATA_DIR, or a directory per user in the temp directory.
+
+    Raises:
+        RuntimeError: If the directory exists but is not private to this user.
+    """
+    directory = os.getenv("APP_DATA_DIR") or os.path.join(tempfile.gettempdir(), f"mobilab-{os.getuid()}")
+    if not is_private_directory(directory):
+        raise RuntimeError(f"{directory} is not a directory private to this user, set APP_DATA_DIR to one that is.")
+    return directory
+
+
+def is_private_directory(directory):
+    """Create `directory` with mode 0700 if needed and check that only this user can access it."""
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        status = os.lstat(directory)
+    except OSError as e:
+        logger.warning(f"Cannot use directory {directory}: {e}")
+        return False
+    return (
+        stat.S_ISDIR(status.st_mode)
+        and status.st_uid == os.getuid()
+        and stat.S_IMODE(status.st_mode) & 0o077 == 0
+    )
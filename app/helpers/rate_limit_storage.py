@@ -0,0 +1,125 @@
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from limits.storage import Storage
+
+logger = logging.getLogger(__name__)
+
+# Purge expired counters once every this many increments
+PURGE_INTERVAL = 1000
+
+# Database used when RATELIMIT_STORAGE_URI is not set, shared by every worker on the host
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), "mobilab_limits.sqlite3")
+
+
+def sqlite_uri(path):
+    """
+    Return the storage URI of the database at `path`.
+
+    The path follows `sqlite://` as is, so an absolute path gives `sqlite:///tmp/limits.sqlite3`.
+    """
+    return f"sqlite://{path}"
+
+
+class SQLiteStorage(Storage):
+    """
+    Rate limit storage backed by a SQLite database that every worker on the host shares.
+
+    With `memory://` each gunicorn worker counts on its own, so the effective limits are as
+    many times looser as there are workers. Counters here live in one WAL-mode database, and a
+    hit is a single upsert that returns the new count, so workers see each other's hits without
+    running Redis next to the app. Supports the fixed-window strategy flask-limiter uses by default.
+
+    Configured with a URI of the form `sqlite:///path/to/limits.sqlite3`.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, timeout: float = 5, **options):
+        """
+        Initialize the storage.
+
+        Args:
+            uri (str): `sqlite://` followed by the path of the database file.
+            wrap_exceptions (bool): Whether to wrap SQLite errors in limits' StorageError.
+            timeout (float): Seconds to wait for another worker's write lock.
+        """
+        self.db_path = uri.removeprefix("sqlite://")
+        if not self.db_path:
+            raise ValueError("The SQLite rate limit storage needs a database path, e.g. sqlite:///tmp/limits.sqlite3.")
+        self.timeout = timeout
+        self._local = threading.local()
+        self._increments = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            "key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        """Return the connection of this thread, reconnecting in forked workers."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection, self._local.pid = conn, os.getpid()
+        return conn
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """
+        Increment a counter, starting a new window of `expiry` seconds if it has expired.
+
+        Returns:
+            int: The count after the increment.
+        """
+        now = time.time()
+        conn = self._connection()
+        (count,), = conn.execute(
+            "INSERT INTO counters (key, count, expires_at) VALUES (:key, :amount, :expires_at) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "count = CASE WHEN expires_at <= :now THEN :amount ELSE count + :amount END, "
+            "expires_at = CASE WHEN expires_at <= :now THEN :expires_at ELSE expires_at END "
+            "RETURNING count",
+            {"key": key, "amount": amount, "expires_at": now + expiry, "now": now},
+        ).fetchall()
+
+        self._increments += 1
+        if self._increments % PURGE_INTERVAL == 0:
+            deleted = conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,)).rowcount
+            logger.debug(f"Purged {deleted} expired rate limit counters.")
+        return count
+
+    def get(self, key: str) -> int:
+        row = self._connection().execute(
+            "SELECT count FROM counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM counters WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        return self._connection().execute("DELETE FROM counters").rowcount
+
+    def clear(self, key: str) -> None:
+        self._connection().execute("DELETE FROM counters WHERE key = ?", (key,))
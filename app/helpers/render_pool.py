@@ -0,0 +1,148 @@
+import logging
+import multiprocessing
+import threading
+import concurrent.futures
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.helpers import fork_safety
+
+logger = logging.getLogger(__name__)
+
+
+class RenderPoolBusy(RuntimeError):
+    """Raised when the render queue is full and a job cannot be accepted."""
+
+
+class RenderPool:
+    """
+    Pool of worker processes for CPU-heavy rendering (matplotlib plots and WeasyPrint layout).
+
+    Jobs are plain module-level functions and their arguments, so they can be pickled to the
+    workers. The number of accepted jobs (running plus queued) is bounded; once the bound is reached
+    `submit` waits up to `queue_timeout` seconds for a slot and then raises RenderPoolBusy.
+    """
+
+    def __init__(self, max_workers=2, max_queue=8, job_timeout=30, queue_timeout=2, initializer=None):
+        """
+        Initialize the pool. Worker processes are started on the first submitted job.
+
+        Args:
+            max_workers (int): Number of worker processes. 0 runs jobs inline on the calling thread.
+            max_queue (int): Number of jobs that may wait for a free worker.
+            job_timeout (float): Default number of seconds to wait for a job result.
+            queue_timeout (float): Number of seconds to wait for a queue slot before rejecting a job.
+            initializer (callable): Module-level function run once in every worker process when it starts.
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.queue_timeout = queue_timeout
+        self.initializer = initializer
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue) if max_workers else None
+        self._executor = None
+        self._lock = threading.Lock()
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Forget the parent's worker processes, this process starts its own on the first job.
+        """
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue) if self.max_workers else None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the parent's threads, locks or open connections
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer,
+                )
+            return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue a job on the pool. Jobs run inline when the pool has no workers.
+
+        Args:
+            fn (callable): Module-level function to run in a worker process.
+            *args, **kwargs: Picklable arguments for the function.
+
+        Returns:
+            Future: Future holding the job result.
+
+        Raises:
+            RenderPoolBusy: If no queue slot frees up within `queue_timeout` seconds.
+        """
+        if not self.max_workers:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise RenderPoolBusy("The render queue is full. Please try again later.")
+        try:
+            try:
+                future = self._get_executor().submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                logger.warning("Render pool is broken, restarting worker processes.")
+                self._reset_executor()
+                future = self._get_executor().submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the job really finishes, even if the caller stopped waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args, timeout=None, **kwargs):
+        """
+        Run a job and wait for its result. Jobs run inline when the pool has no workers.
+
+        Args:
+            fn (callable): Module-level function to run.
+            *args, **kwargs: Picklable arguments for the function.
+            timeout (float): Seconds to wait for the result, defaults to `job_timeout`.
+
+        Returns:
+            The job result, pickled by the worker process and sent back through a pipe.
+
+        Raises:
+            RenderPoolBusy: If the queue is full.
+            concurrent.futures.TimeoutError: If the job does not finish in time. Before Python 3.11
+                this is not the builtin TimeoutError.
+        """
+        if not self.max_workers:
+            return fn(*args, **kwargs)
+
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout or self.job_timeout)
+        except concurrent.futures.TimeoutError:
+            # Drop the job if it has not started yet, otherwise its slot frees up when it ends
+            future.cancel()
+            logger.error(f"Render job {getattr(fn, '__name__', fn)} timed out.")
+            raise
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise
+
+    def _reset_executor(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait=True):
+        """
+        Stop the worker processes.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,5 +1,6 @@
 from functools import wraps
-from flask import session, redirect, url_for, flash
+from flask import session, redirect, url_for, flash, get_flashed_messages, stream_template, Response
+from flask_wtf.csrf import generate_csrf
 
 def login_required(f):
     """Custom decorator that protects routes from users that are not logged in."""
@@ -28,3 +29,14 @@ def requires_role(role):
             return f(*args, **kwargs)
         return wrapper
     return decorator
+
+def stream_page(template_name, **context):
+    """
+    Render a template as a streamed response, sending the page to the client while it is rendered.
+
+    The response headers, including the session cookie, are sent before the template runs. Flashed
+    messages and the CSRF token both modify the session, so they are loaded up front.
+    """
+    get_flashed_messages(with_categories=True)
+    generate_csrf()
+    return Response(stream_template(template_name, **context), mimetype="text/html")
@@ -1,9 +1,39 @@
-def store_prediction_results(session, result, features, explanation_text, model):
+# Claims of the Auth0 userinfo that the application reads from the session
+SESSION_USER_CLAIMS = (
+    "sub",
+    "name",
+    "nickname",
+    "email",
+    "https://mobilab.demo.app.com/roles",
+    "https://mobilab.demo.app.com/approved",
+)
+
+
+def store_prediction_results(session, result, features, explanation_text, model, state_store):
     """
-    Stores prediction results in the session.
+    Stores prediction results in the server-side state store and keeps only its ID in the session.
     """
-    session['prediction_values'] = features
-    session['prediction'] = result.get("prediction")
-    session['contributions_explanation'] = explanation_text
-    session['contributions'] = result.get("contributions")
-    session['model'] = model
\ No newline at end of file
+    previous_id = session.get('prediction_id')
+    session['prediction_id'] = state_store.save({
+        'prediction_values': features,
+        'prediction': result.get("prediction"),
+        'contributions_explanation': explanation_text,
+        'contributions': result.get("contributions"),
+        'model': model,
+    })
+    if previous_id:
+        state_store.delete(previous_id)
+
+
+def load_prediction_results(session, state_store):
+    """
+    Loads the prediction results referenced by the session, or an empty dict if there are none.
+    """
+    return state_store.load(session.get('prediction_id')) or {}
+
+
+def session_user(userinfo):
+    """
+    Reduces the Auth0 userinfo to the claims stored in the session cookie.
+    """
+    return {claim: userinfo[claim] for claim in SESSION_USER_CLAIMS if claim in userinfo}
@@ -0,0 +1,177 @@
+import json
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from app.helpers import fork_safety
+
+logger = logging.getLogger(__name__)
+
+# Purge expired rows from the shared tier once every this many writes
+PURGE_INTERVAL = 100
+
+
+class StateStore:
+    """
+    Server-side store for per-user state that is too large for the cookie session.
+
+    Entries are JSON-serialisable dicts addressed by an opaque random ID. An in-process LRU,
+    bounded by the total size of the encoded entries, sits in front of an optional SQLite
+    tier that every worker on the host shares. Entries expire `ttl` seconds after they were written.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, ttl=8 * 3600, db_path=None):
+        """
+        Initialize the store.
+
+        Args:
+            max_bytes (int): Upper bound for the in-process tier, in encoded bytes.
+            ttl (float): Lifetime of an entry in seconds.
+            db_path (str): Optional path of the SQLite database shared by workers.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.db_path = db_path
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        fork_safety.register(self)
+
+        if self.db_path:
+            with self._connection() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS state ("
+                    "id TEXT PRIMARY KEY, payload TEXT NOT NULL, size INTEGER NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS state_expires_at ON state (expires_at)")
+
+    def after_fork(self):
+        """
+        Drop the SQLite connections and lock inherited from the parent process.
+        """
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self):
+        """Return the thread-local SQLite connection."""
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = conn
+        return conn
+
+    def save(self, payload, state_id=None):
+        """
+        Store a payload and return its ID.
+
+        Args:
+            payload (dict): JSON-serialisable state.
+            state_id (str): ID to overwrite, a new random ID is generated when omitted.
+
+        Returns:
+            str: The ID of the stored state.
+        """
+        state_id = state_id or secrets.token_urlsafe(16)
+        encoded = json.dumps(payload, separators=(",", ":"))
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._store_memory(state_id, encoded, expires_at)
+            self._writes += 1
+            purge = self._writes % PURGE_INTERVAL == 0
+
+        if self.db_path:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO state (id, payload, size, expires_at) VALUES (?, ?, ?, ?)",
+                    (state_id, encoded, len(encoded), expires_at),
+                )
+                if purge:
+                    self.purge_expired()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to persist state {state_id}: {e}", exc_info=True)
+        return state_id
+
+    def load(self, state_id):
+        """
+        Return the payload stored under an ID, or None when it is unknown or expired.
+        """
+        if not state_id:
+            return None
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(state_id)
+            if entry is not None:
+                encoded, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(state_id)
+                    return json.loads(encoded)
+                self._remove_memory(state_id)
+
+        if not self.db_path:
+            return None
+        try:
+            row = self._connection().execute(
+                "SELECT payload, expires_at FROM state WHERE id = ? AND expires_at > ?", (state_id, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to load state {state_id}: {e}", exc_info=True)
+            return None
+        if row is None:
+            return None
+
+        encoded, expires_at = row
+        with self._lock:
+            self._store_memory(state_id, encoded, expires_at)
+        return json.loads(encoded)
+
+    def delete(self, state_id):
+        """
+        Remove the state stored under an ID.
+        """
+        if not state_id:
+            return
+        with self._lock:
+            self._remove_memory(state_id)
+        if self.db_path:
+            try:
+                self._connection().execute("DELETE FROM state WHERE id = ?", (state_id,))
+            except sqlite3.Error as e:
+                logger.error(f"Failed to delete state {state_id}: {e}", exc_info=True)
+
+    def purge_expired(self):
+        """
+        Drop expired entries from both tiers.
+        """
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                self._remove_memory(key)
+        if self.db_path:
+            self._connection().execute("DELETE FROM state WHERE expires_at <= ?", (now,))
+
+    def _store_memory(self, state_id, encoded, expires_at):
+        """Insert into the in-process tier and evict least recently used entries. Caller holds the lock."""
+        self._remove_memory(state_id)
+        if len(encoded) > self.max_bytes:
+            return
+        self._entries[state_id] = (encoded, expires_at)
+        self.current_bytes += len(encoded)
+        while self.current_bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
+    def _remove_memory(self, state_id):
+        """Remove an entry from the in-process tier. Caller holds the lock."""
+        entry = self._entries.pop(state_id, None)
+        if entry is not None:
+            self.current_bytes -= len(entry[0])
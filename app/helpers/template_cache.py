@@ -0,0 +1,33 @@
+import logging
+import os
+from jinja2 import FileSystemBytecodeCache
+from app.helpers.private_dir import is_private_directory
+
+logger = logging.getLogger(__name__)
+
+_bytecode_cache = None
+_bytecode_cache_loaded = False
+
+
+def bytecode_cache():
+    """
+    Return the process-wide Jinja bytecode cache, or None if its directory is not safe to use.
+
+    Compiled templates are written to a directory that every worker shares, so only the first
+    worker after a deploy compiles a template and the others load its bytecode. Bytecode read from
+    the directory is executed, so it must only be writable by this user. By default Jinja's own
+    per-user directory is used, which Jinja creates with mode 0700 and checks the owner of. A
+    directory given in JINJA_CACHE_DIR gets the same checks.
+    """
+    global _bytecode_cache, _bytecode_cache_loaded
+    if not _bytecode_cache_loaded:
+        directory = os.getenv("JINJA_CACHE_DIR")
+        if not directory:
+            _bytecode_cache = FileSystemBytecodeCache()
+        elif is_private_directory(directory):
+            _bytecode_cache = FileSystemBytecodeCache(directory)
+        else:
+            logger.warning(f"Not caching compiled templates, {directory} is not a directory private to this user.")
+        _bytecode_cache_loaded = True
+    return _bytecode_cache
+
@@ -0,0 +1,135 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from app.helpers import fork_safety
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Buffers records in memory and writes them in batches from a background thread.
+
+    `append` never touches the database, so callers on the request path only pay for a queue put.
+    The writer flushes whenever `batch_size` records are waiting or `flush_interval` seconds have
+    passed, and once more when the process exits.
+    """
+
+    def __init__(self, write_batch, batch_size=100, flush_interval=2.0, max_pending=10000, max_retries=3):
+        """
+        Initialize the buffer. The writer thread is started on the first append.
+
+        Args:
+            write_batch (callable): Writes a list of records, raising on failure.
+            batch_size (int): Maximum number of records per write.
+            flush_interval (float): Maximum number of seconds a record waits before being written.
+            max_pending (int): Maximum number of buffered records, further records are dropped.
+            max_retries (int): Number of attempts for a failing batch before it is dropped.
+        """
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+        self.dropped = 0
+        atexit.register(self.close)
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Start from an empty queue, the parent's writer thread does not exist in this process.
+        """
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def append(self, record):
+        """
+        Queue a record for writing without blocking.
+
+        Returns:
+            bool: False if the buffer is full and the record was dropped.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.error(f"Write-behind buffer is full, dropped a record ({self.dropped} dropped so far).")
+            return False
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._write(batch)
+        # Drain whatever is left after close() was requested
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            self._write(batch)
+
+    def _collect_batch(self):
+        """Wait for the first record, then gather more until the batch is full or the interval ends."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stopped.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.write_batch(batch)
+                return
+            except Exception as e:
+                logger.error(f"Failed to write batch of {len(batch)} records (attempt {attempt}/{self.max_retries}): {e}",
+                             exc_info=True)
+                if attempt < self.max_retries:
+                    time.sleep(min(self.flush_interval * 2 ** attempt, 10))
+        self.dropped += len(batch)
+
+    def close(self, timeout=10):
+        """
+        Stop the writer thread after flushing the buffered records.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopped.set()
+        thread.join(timeout)
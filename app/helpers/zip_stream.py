@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+
+class _ChunkWriter(io.RawIOBase):
+    """Write-only, non-seekable file that collects written bytes until they are taken."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        """Return and forget everything written since the last call."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries):
+    """
+    Build a ZIP archive on the fly.
+
+    The archive is written to a non-seekable stream, so zipfile stores each entry's sizes in a
+    data descriptor after its content and nothing has to be rewritten later. Only the entry
+    being added is held in memory.
+
+    Args:
+        entries (iterable): (file name, bytes) tuples, consumed lazily.
+
+    Yields:
+        bytes: The archive, one chunk per entry followed by the central directory.
+    """
+    writer = _ChunkWriter()
+    # PDFs are compressed already, storing them saves CPU for little size difference
+    with zipfile.ZipFile(writer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            yield writer.take()
+    yield writer.take()
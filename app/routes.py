@@ -1,28 +1,36 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, make_response, send_file, g
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, make_response, send_file, g, Response, stream_with_context, jsonify
 import json
+import csv
+import io
 from os import environ as env
 from urllib.parse import quote_plus, urlencode
 import requests
+import concurrent.futures
 from .form import PredictionForm, CSRFProtectionForm
 from app import oauth
-from app.helpers.routes_helper import login_required, requires_role
+from app.helpers.routes_helper import login_required, requires_role, stream_page
+from app.helpers.auth0_helper import auth0_base_url, searchable_pages, APPROVED_QUERY, PENDING_QUERY
 from app.services.auth_service import (
-    fetch_all_users,
-    fetch_pending_approvals,
+    bulk_update_users,
     approve_user,
     reject_user,
     handle_auth_callback,
 )
 import secrets
 import logging
-from app.helpers.session_helper import store_prediction_results
+from app.helpers.session_helper import store_prediction_results, load_prediction_results
 from . import limiter
 from flask import current_app as app
 from app.helpers.report_builder import ReportBuilder, ReportDirector
-from app.helpers.pdf_generator import generate_pdf
+from app.helpers.pdf_generator import html_to_pdf, pdf_render_job, model_document_key, PDF_TEMPLATE_VERSION
+from app.services.report_job_service import ReportJobRejected, DONE
+from app.helpers.cache import content_key
+from app.helpers.zip_stream import stream_zip
+from app.helpers.render_pool import RenderPoolBusy
+from app.helpers.load_shedder import LoadShedder
+from app.dao.prediction_history_dao import HISTORY_COLUMNS
 from app.error_handlers import flash_form_errors
-from io import BytesIO
-import base64
+from functools import partial
 
 
 main = Blueprint('main', __name__)
@@ -30,13 +38,26 @@ logger = logging.getLogger(__name__)
 
 logger.info("Application started successfully!")
 
+# Maximum number of users in one bulk approve or reject
+BULK_UPDATE_MAX_USERS = int(env.get("BULK_UPDATE_MAX_USERS", 100))
+
+# Routes that wait on the prediction API or WeasyPrint shed load instead of queueing
+# until the worker times out; lightweight routes are not limited
+LOAD_SHED_MAX_WAIT = float(env.get("LOAD_SHED_MAX_WAIT", 10))
+shed_predictions = LoadShedder(
+    "prediction", max_concurrent=int(env.get("PREDICTION_MAX_CONCURRENT", 4)), max_wait=LOAD_SHED_MAX_WAIT, methods=("POST",)
+)
+shed_pdf_downloads = LoadShedder(
+    "PDF download", max_concurrent=int(env.get("PDF_DOWNLOAD_MAX_CONCURRENT", 4)), max_wait=LOAD_SHED_MAX_WAIT
+)
+
 # Register Auth0 OAuth
 auth0 = oauth.register(
     "auth0",
     client_id=env.get("AUTH0_CLIENT_ID"),
     client_secret=env.get("AUTH0_CLIENT_SECRET"),
     client_kwargs={"scope": "openid profile email"},
-    server_metadata_url=f'https://{env.get("AUTH0_DOMAIN")}/.well-known/openid-configuration'
+    server_metadata_url=f"{auth0_base_url()}/.well-known/openid-configuration"
 )
 
 @main.route('/')
@@ -76,7 +97,7 @@ def logout():
     """Handles logout with Auth0."""
     session.clear()
     return redirect(
-        "https://" + env.get("AUTH0_DOMAIN")
+        auth0_base_url()
         + "/v2/logout?"
         + urlencode(
             {
@@ -97,11 +118,13 @@ def pending_approval():
 @main.route("/input", methods=["GET", "POST"])
 @login_required
 @limiter.limit("5 per minute")
+@shed_predictions
 def input_params():
     """
     Handles model interaction using a form.
     """
     prediction = None
+    plot_uri = None
 
     try:
         # Fetch available models
@@ -120,7 +143,9 @@ def input_params():
                     raise ValueError("No model available.")
 
                 # Process prediction request
-                result = prediction_service.process_prediction_request(form, selected_model)
+                result = prediction_service.process_prediction_request(
+                    form, selected_model, session.get("user", {}).get("sub")
+                )
 
                 if result["success"]:
                     # Store results in session
@@ -129,9 +154,12 @@ def input_params():
                         result,
                         result["features"],
                         result["explanation_text"],
-                        selected_model
+                        selected_model,
+                        app.state_store
                     )
                     prediction = result["prediction"]
+                    if result["contributions_plot"]:
+                        plot_uri = f"data:{result['contributions_plot_mimetype']};base64,{result['contributions_plot']}"
                 else:
                     flash(result["error"], "input_params")
                     
@@ -149,6 +177,7 @@ def input_params():
         "input_params.html",
         form=form,
         prediction=prediction,
+        plot_uri=plot_uri,
         models=models,
         session=session.get("user"),
         pretty=json.dumps(session.get("user"), indent=4),
@@ -162,26 +191,24 @@ def input_params():
 def dashboard():
     """Serves LIME plot and parameters used to make predictions from the last prediction."""
     feature_service = app.feature_service
-    contributions = session.get("contributions", None)
-    prediction = session.get("prediction_values", {}).get("prediction", 0)
+    state = load_prediction_results(session, app.state_store)
+    contributions = state.get("contributions", None)
+    prediction = state.get("prediction", 0)
 
     if not contributions:
         flash("No contributions available. Please make a prediction first.", "warning")
         return redirect(url_for("main.input_params"))
 
     try:
-        # Dynamically generate the plot using the contributions data
-        plot_buffer = feature_service._generate_contributions_plot(contributions, prediction)
-        if not plot_buffer:
-            raise ValueError("Plot buffer is None. Plot generation failed.")
-        plot_data = base64.b64encode(plot_buffer.getvalue()).decode("utf-8")
+        # Reuse the plot rendered for the prediction, rendering only on a cache miss
+        plot_uri = feature_service.contributions_plot_data_uri(contributions, prediction)
     except Exception as e:
         logger.error(f"Error generating plot: {str(e)}", exc_info=True)
         flash("Failed to generate the plot. Please try again.", "danger")
         return redirect(url_for("main.input_params"))
 
-    prediction_values = session.get("prediction_values", None)
-    contributions_explanation = session.get("contributions_explanation", None)
+    prediction_values = state.get("prediction_values", None)
+    contributions_explanation = state.get("contributions_explanation", None)
     form = PredictionForm()
 
     if not prediction_values:
@@ -193,11 +220,11 @@ def dashboard():
     director = ReportDirector(builder)
     web_report = director.build_web_report(
         parameters=prediction_values,
-        plot_path=f"data:image/png;base64,{plot_data}",
+        plot_path=plot_uri,
         form=form
     )
 
-    return render_template(
+    return stream_page(
         "dashboard.html",
         report=web_report.get_sections(),
         explanation=contributions_explanation,
@@ -206,51 +233,154 @@ def dashboard():
     )
 
 
-@main.route("/download_report", methods=["GET"])
-@login_required
-@limiter.limit("5 per minute")
-def download_report():
-    """Generate and download the prediction report as a PDF."""
-    model_dao = app.model_dao
-    model = session.get("model", None)
-    feature_service = app.feature_service
-    contributions = session.get("contributions", None)
+def _pdf_report_key(state, metadata):
+    """Identical inputs on the same model version always produce the same PDF."""
+    return content_key(
+        "pdf_report", state.get("prediction_values", {}), state.get("contributions"),
+        state.get("contributions_explanation", "No explanation available."), state.get("model"),
+        metadata.get("version"), app.feature_service.chart_format, PDF_TEMPLATE_VERSION
+    )
+
+
+def _pdf_render_job(state, metadata):
+    """
+    Build the PDF report for the stored prediction.
+
+    The model pages are passed separately, so render workers lay them out once per model version.
+
+    Returns:
+        tuple: (report HTML, keyword arguments for html_to_pdf)
 
-    prediction = session.get("prediction_values", {}).get("prediction", 1)
-    explanation = session.get("contributions_explanation", "No explanation available.")
-    parameters = session.get("prediction_values", {})
-    metadata = model_dao.get_metrics(model)
-    plots = model_dao.get_plots(model)
-    report = model_dao.get_report(model)["report"]
-    report = json.loads(report)
+    Raises:
+        ValueError: If the contributions plot cannot be generated.
+    """
+    model_name = state.get("model", None)
+    model_sections = app.model_report_service.get_model_sections(model_name, metadata)
 
     try:
-        # Dynamically generate the plot using the contributions data
-        plot_buffer = feature_service._generate_contributions_plot(contributions, prediction)
-        if not plot_buffer:
-            raise ValueError("Plot buffer is None. Plot generation failed.")
-        plot_data = base64.b64encode(plot_buffer.getvalue()).decode("utf-8")
+        # Reuse the plot rendered for the prediction, rendering only on a cache miss
+        plot_uri = app.feature_service.contributions_plot_data_uri(state.get("contributions"), state.get("prediction", 0))
     except Exception as e:
         logger.error(f"Error generating plot: {str(e)}", exc_info=True)
-        flash("Failed to generate the plot. Please try again.", "danger")
-        return redirect(url_for("main.input_params"))
+        raise ValueError("Failed to generate the plot. Please try again.")
 
     form = PredictionForm()
 
     # Build report
     builder = ReportBuilder()
     director = ReportDirector(builder)
-    pdf_report = director.build_pdf_report(explanation=explanation, contribution_image_path=f"data:image/png;base64,{plot_data}", parameters=parameters, form=form, metadata=metadata, plots=plots, report=report)
+    report = director.build_prediction_report(
+        explanation=state.get("contributions_explanation", "No explanation available."),
+        contribution_image_path=plot_uri,
+        parameters=state.get("prediction_values", {}),
+        form=form,
+    )
+    return pdf_render_job(report, model_sections, model_document_key(model_name, metadata.get("version")))
+
 
-    # Generate PDF
-    pdf = generate_pdf(pdf_report)
+@main.route("/download_report", methods=["GET"])
+@login_required
+@limiter.limit("5 per minute")
+@shed_pdf_downloads
+def download_report():
+    """Generate and download the prediction report as a PDF."""
+    state = load_prediction_results(session, app.state_store)
+
+    if not state.get("contributions"):
+        flash("No contributions available. Please make a prediction first.", "warning")
+        return redirect(url_for("main.input_params"))
+
+    metadata = app.model_dao.get_metrics(state.get("model"))
+
+    report_key = _pdf_report_key(state, metadata)
+    if request.if_none_match.contains(report_key):
+        response = make_response("", 304)
+        response.set_etag(report_key)
+        return response
+
+    pdf = app.pdf_cache.get(report_key)
+    if pdf is None:
+        try:
+            html_content, render_options = _pdf_render_job(state, metadata)
+        except ValueError as e:
+            flash(str(e), "danger")
+            return redirect(url_for("main.input_params"))
 
-    return send_file(
-        BytesIO(pdf),
+        # Generate PDF in the render pool so the layout does not block this worker
+        try:
+            pdf = app.render_pool.run(html_to_pdf, html_content, **render_options)
+        except (RenderPoolBusy, concurrent.futures.TimeoutError) as e:
+            logger.error(f"Error generating PDF report: {str(e)}", exc_info=True)
+            flash("The report service is busy. Please try again in a moment.", "danger")
+            return redirect(url_for("main.dashboard"))
+        app.pdf_cache.put(report_key, pdf)
+
+    response = send_file(
+        io.BytesIO(pdf),
         mimetype="application/pdf",
         as_attachment=True,
-        download_name="report.pdf"
+        download_name="report.pdf",
+        etag=report_key,
+        max_age=0,
     )
+    # Let the browser keep the PDF but revalidate it with If-None-Match
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@main.route("/reports", methods=["POST"])
+@login_required
+@limiter.limit("5 per minute")
+def submit_report_job():
+    """Queues PDF generation for the last prediction and returns the job ID."""
+    state = load_prediction_results(session, app.state_store)
+    if not state.get("contributions"):
+        return jsonify({"error": "No contributions available. Please make a prediction first."}), 400
+
+    metadata = app.model_dao.get_metrics(state.get("model"))
+    try:
+        html_content, render_options = _pdf_render_job(state, metadata)
+        job_id = app.report_job_service.submit(
+            session["user"].get("sub"), _pdf_report_key(state, metadata), html_content, **render_options
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 500
+    except ReportJobRejected as e:
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for("main.report_job_status", job_id=job_id),
+        "download_url": url_for("main.download_report_job", job_id=job_id),
+    }), 202
+
+
+@main.route("/reports/<job_id>", methods=["GET"])
+@login_required
+# Polled while a report renders, a cheap read that must not use up the default limits
+@limiter.exempt
+def report_job_status(job_id):
+    """Returns the status of a PDF report job."""
+    job = app.report_job_service.get_job(job_id, session["user"].get("sub"))
+    if not job:
+        return jsonify({"error": "Report job not found."}), 404
+    return jsonify({"job_id": job_id, "status": job["status"], "error": job["error"]})
+
+
+@main.route("/reports/<job_id>/download", methods=["GET"])
+@login_required
+def download_report_job(job_id):
+    """Serves the PDF of a finished report job."""
+    job = app.report_job_service.get_job(job_id, session["user"].get("sub"))
+    if not job:
+        flash("The report has expired. Please generate it again.", "warning")
+        return redirect(url_for("main.dashboard"))
+
+    path = app.report_job_service.result_path(job_id)
+    if job["status"] != DONE or not path:
+        return jsonify({"error": "The report is not ready yet.", "status": job["status"]}), 409
+
+    return send_file(path, mimetype="application/pdf", as_attachment=True, download_name="report.pdf")
 
 
 @main.route("/models", methods=["GET", "POST"])
@@ -279,23 +409,18 @@ def models():
     selected_model = selected_model or (models[0] if models else "No models available")
 
     try:
-        metrics = model_dao.get_metrics(selected_model)
-        plots = model_dao.get_plots(selected_model)
-        report = json.loads(model_dao.get_report(selected_model)["report"])
+        # Sections are rendered once per model version and reused afterwards
+        sections = app.model_report_service.get_model_sections(selected_model)
     except Exception as e:
         logger.error(f"Error fetching model data for {selected_model}: {str(e)}", exc_info=True)
         flash(f"Error retrieving information for {selected_model}.", "danger")
-        metrics, plots, report = {}, {}, {}
-
-    builder = ReportBuilder()
-    director = ReportDirector(builder)
-    model_report = director.build_model_report(metrics, plots, report)
+        sections = []
 
-    metrics_content = next((section["content"] for section in model_report.get_sections() if section["title"] == "Model Metadata"), "")
-    plots_content = next((section["content"] for section in model_report.get_sections() if section["title"] == "Model Plots"), "")
-    report_content = next((section["content"] for section in model_report.get_sections() if section["title"] == "Model Report"), "")
+    metrics_content = next((section["content"] for section in sections if section["title"] == "Model Metadata"), "")
+    plots_content = next((section["content"] for section in sections if section["title"] == "Model Plots"), "")
+    report_content = next((section["content"] for section in sections if section["title"] == "Model Report"), "")
 
-    return render_template(
+    return stream_page(
         "models.html",
         models=models,
         selected_model=selected_model,
@@ -307,6 +432,124 @@ def models():
     )
 
 
+@main.route("/history", methods=["GET"])
+@login_required
+@limiter.limit("20 per minute")
+@requires_role("admin")
+def history():
+    """Serves the prediction history one page at a time, newest first."""
+    page_size = 50
+    before_id = request.args.get("before", type=int)
+    predictions = app.prediction_history_dao.get_predictions(before_id=before_id, limit=page_size)
+    next_before_id = predictions[-1]["predictionId"] if len(predictions) == page_size else None
+
+    return render_template(
+        "history.html",
+        predictions=predictions,
+        next_before_id=next_before_id,
+        max_reports=app.bulk_report_service.max_reports,
+        form=CSRFProtectionForm(),
+        page_name="history"
+    )
+
+
+def _history_state(row):
+    """Convert a prediction history row to the state stored for a prediction."""
+    return {
+        "prediction_values": json.loads(row["features"]),
+        "prediction": row["prediction"],
+        "contributions_explanation": row["explanation"] or "No explanation available.",
+        "contributions": json.loads(row["contributions"]) if row["contributions"] else None,
+        "model": row["model"],
+    }
+
+
+@main.route("/history/reports.zip", methods=["POST"])
+@login_required
+@limiter.limit("2 per minute")
+@requires_role("admin")
+def export_history_reports():
+    """Streams the PDF reports of the selected predictions as a ZIP archive."""
+    form = CSRFProtectionForm()
+    if not form.validate_on_submit():
+        flash("CSRF token validation failed", "history")
+        return redirect(url_for("main.history"))
+
+    bulk_report_service = app.bulk_report_service
+    prediction_ids = request.form.getlist("prediction_ids", type=int)
+    if not prediction_ids:
+        flash("Select at least one prediction to export.", "history")
+        return redirect(url_for("main.history"))
+    if len(prediction_ids) > bulk_report_service.max_reports:
+        flash(f"At most {bulk_report_service.max_reports} reports can be exported at once.", "history")
+        return redirect(url_for("main.history"))
+
+    rows = app.prediction_history_dao.get_predictions_by_ids(prediction_ids)
+
+    def jobs(errors):
+        metrics = {}  # model -> metadata, fetched once per model
+        for row in rows:
+            name = f"report_{row['predictionId']}.pdf"
+            state = _history_state(row)
+            if not state["contributions"]:
+                errors.append(f"{name}: The prediction has no contributions.")
+                continue
+            try:
+                if state["model"] not in metrics:
+                    metrics[state["model"]] = app.model_dao.get_metrics(state["model"])
+                metadata = metrics[state["model"]]
+                report_key = _pdf_report_key(state, metadata)
+            except Exception as e:
+                logger.error(f"Error building report for prediction {row['predictionId']}: {str(e)}", exc_info=True)
+                errors.append(f"{name}: The report could not be generated.")
+                continue
+            # The HTML is only built when the PDF is not cached by the time the report is queued
+            yield name, report_key, partial(_pdf_render_job, state, metadata)
+
+    def entries():
+        errors = [f"report_{prediction_id}.pdf: Prediction not found." for prediction_id in
+                  sorted(set(prediction_ids) - {row["predictionId"] for row in rows})]
+        for name, pdf, error in bulk_report_service.render(jobs(errors)):
+            if error:
+                errors.append(f"{name}: {error}")
+            else:
+                yield name, pdf
+        if errors:
+            yield "errors.txt", "\n".join(errors).encode("utf-8")
+
+    return Response(
+        stream_with_context(stream_zip(entries())),
+        mimetype="application/zip",
+        headers={"Content-Disposition": "attachment; filename=prediction_reports.zip"},
+    )
+
+
+@main.route("/history/export.csv", methods=["GET"])
+@login_required
+@limiter.limit("5 per minute")
+@requires_role("admin")
+def export_history():
+    """Streams the full prediction history as CSV without loading it into memory."""
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=HISTORY_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for index, row in enumerate(app.prediction_history_dao.iter_predictions(), start=1):
+            writer.writerow(row)
+            # Send rows in chunks instead of one write per row
+            if index % 200 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=prediction_history.csv"},
+    )
+
+
 @main.route("/admin", methods=["GET", "POST"])
 @login_required
 @limiter.limit("20 per minute")
@@ -319,18 +562,29 @@ def admin():
             flash("CSRF token validation failed", "error")
             return redirect(url_for("main.admin"))
 
+    # Users are shown one page at a time, each tab has its own page
+    page = max(request.args.get("page", 0, type=int), 0)
+    pending_page = max(request.args.get("pending_page", 0, type=int), 0)
+    directory = {"users": [], "users_total": 0, "pending_users": [], "pending_total": 0}
     try:
-        users = fetch_all_users()
-        pending_users = fetch_pending_approvals()
+        directory = app.admin_directory_service.get_directory(page, pending_page)
     except ValueError as e:
         flash(f"Error fetching pending approvals: {str(e)}", "admin")
-        pending_users = []
 
+    per_page = app.admin_directory_service.per_page
     return render_template(
         "admin.html",
-        users=users,
+        users=directory["users"],
         form=form,
-        pending_users=pending_users,
+        pending_users=directory["pending_users"],
+        page=page,
+        pending_page=pending_page,
+        # Auth0 cannot page past its search limit, so no link leads there
+        has_next_page=page + 1 < searchable_pages(directory["users_total"], per_page, APPROVED_QUERY),
+        has_next_pending_page=pending_page + 1 < searchable_pages(directory["pending_total"], per_page, PENDING_QUERY),
+        users_total=directory["users_total"],
+        pending_total=directory["pending_total"],
+        active_tab=request.args.get("tab", "pending"),
         session=session.get("user"),
         pretty=json.dumps(session.get("user"), indent=4),
         page_name="admin"
@@ -350,6 +604,7 @@ def approve_user_route(user_id):
     
     try:
         result = approve_user(user_id)
+        app.admin_directory_service.mark_approved(user_id)
         flash(result["message"], "success")
     except ValueError as e:
         flash(str(e), "error")
@@ -370,12 +625,52 @@ def reject_user_route(user_id):
     
     try:
         result = reject_user(user_id)
+        app.admin_directory_service.mark_rejected(user_id)
         flash(result["message"], "success")
     except ValueError as e:
         flash(str(e), "error")
     return redirect(url_for("main.admin"))
 
 
+@main.route("/admin/bulk", methods=["POST"])
+@login_required
+@limiter.limit("5 per minute")
+@requires_role("admin")
+def bulk_update_users_route():
+    """Approves or rejects the selected users and reports the result per user."""
+    form = CSRFProtectionForm()
+    if not form.validate_on_submit():
+        flash("CSRF token validation failed", "error")
+        return redirect(url_for("main.admin"))
+
+    action = request.form.get("action")
+    user_ids = request.form.getlist("user_ids")
+    if action not in ("approve", "reject") or not user_ids:
+        flash("Select at least one user and an action.", "admin")
+        return redirect(url_for("main.admin"))
+    if len(user_ids) > BULK_UPDATE_MAX_USERS:
+        flash(f"At most {BULK_UPDATE_MAX_USERS} users can be updated at once.", "admin")
+        return redirect(url_for("main.admin"))
+
+    results = bulk_update_users(user_ids, approve=action == "approve")
+    for user_id, result in results.items():
+        if result["success"]:
+            if action == "approve":
+                app.admin_directory_service.mark_approved(user_id)
+            else:
+                app.admin_directory_service.mark_rejected(user_id)
+
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(results)
+
+    succeeded = sum(1 for result in results.values() if result["success"])
+    flash(f"{succeeded} of {len(results)} users {action}d.", "success")
+    for user_id, result in results.items():
+        if not result["success"]:
+            flash(f"{user_id}: {result['message']}", "admin")
+    return redirect(url_for("main.admin"))
+
+
 @main.route("/rate_limit_exceeded")
 @login_required
 def rate_limit_exceeded():
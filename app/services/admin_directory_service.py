@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.helpers import fork_safety
+from app.services.auth_service import fetch_users_page, fetch_pending_page, fetch_role_map
+
+logger = logging.getLogger(__name__)
+
+USERS = "users"
+PENDING = "pending"
+
+
+class AdminDirectoryService:
+    """
+    Service for the users shown on the admin page.
+
+    The admin page shows one page of approved users and one page of pending users at a time.
+    Pages are loaded from Auth0 concurrently and kept for `ttl` seconds. The roles of all users
+    come from one members listing per role, which is kept for `ttl` seconds as well and joined
+    with every page of approved users loaded meanwhile. Approving or rejecting a user removes it
+    from the cached page it is on and adjusts the cached totals instead of reloading the
+    directory. Only cached later pages of that list, whose users shift by one, are loaded again.
+    The cache is per process, so other workers pick up those changes when their copy expires.
+    """
+
+    def __init__(self, ttl=60, per_page=50, fetch_users=fetch_users_page, fetch_pending=fetch_pending_page,
+                 fetch_roles=fetch_role_map):
+        """
+        Initialize AdminDirectoryService.
+
+        Args:
+            ttl (float): Seconds after which pages are loaded from Auth0 again.
+            per_page (int): Users per page.
+            fetch_users (callable): Returns (approved users with roles, total) for a page.
+            fetch_pending (callable): Returns (pending users, total) for a page.
+            fetch_roles (callable): Returns the role name per user ID, or None if unavailable.
+        """
+        self.ttl = ttl
+        self.per_page = per_page
+        self.fetch_users = fetch_users
+        self.fetch_pending = fetch_pending
+        self.fetch_roles = fetch_roles
+        self._pages = {}  # (USERS or PENDING, page) -> (loaded at, users, total)
+        self._roles = None  # (loaded at, role name per user ID or None)
+        self._lock = threading.Lock()  # Guards the cached pages
+        self._load_lock = threading.Lock()  # Only one thread loads from Auth0 at a time
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Replace the locks inherited from the parent process, which may have been held at fork time.
+        """
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def get_directory(self, page=0, pending_page=0):
+        """
+        Return one page of approved users and one page of pending users, loading missing pages.
+
+        Args:
+            page (int): Zero-based page of approved users.
+            pending_page (int): Zero-based page of pending users.
+
+        Returns:
+            dict: "users" and "users_total", "pending_users" and "pending_total".
+
+        Raises:
+            ValueError: If the users cannot be fetched from Auth0.
+        """
+        users_key, pending_key = (USERS, page), (PENDING, pending_page)
+        with self._lock:
+            cached = self._get_fresh(users_key), self._get_fresh(pending_key)
+        if None in cached:
+            with self._load_lock:
+                cached = self._load(users_key, pending_key)
+
+        (users, users_total), (pending_users, pending_total) = cached
+        return {"users": users, "users_total": users_total, "pending_users": pending_users, "pending_total": pending_total}
+
+    def _get_fresh(self, key):
+        entry = self._pages.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            return None
+        return entry[1], entry[2]
+
+    def _load(self, users_key, pending_key):
+        """Load the missing pages, the pending page alongside the roles and the users page."""
+        with self._lock:
+            users, pending = self._get_fresh(users_key), self._get_fresh(pending_key)
+            roles = self._roles if self._roles and time.monotonic() - self._roles[0] < self.ttl else None
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="admin-directory") as executor:
+            pending_future = executor.submit(self.fetch_pending, pending_key[1], self.per_page) if pending is None else None
+            if users is None:
+                if roles is None:
+                    roles = (time.monotonic(), self.fetch_roles())
+                # Without a role map the roles of the users on this page are looked up per user
+                users = self.fetch_users(users_key[1], self.per_page, roles[1])
+            if pending_future is not None:
+                pending = pending_future.result()
+
+        now = time.monotonic()
+        with self._lock:
+            self._roles = roles if roles is not None else self._roles
+            self._pages[users_key] = (now, *users)
+            self._pages[pending_key] = (now, *pending)
+            # Pages of an older load may be out of date, keep only the fresh ones
+            self._pages = {key: entry for key, entry in self._pages.items() if now - entry[0] < self.ttl}
+        logger.info(f"Loaded admin directory pages {users_key[1]} and {pending_key[1]}.")
+        return users, pending
+
+    def mark_approved(self, user_id):
+        """
+        Remove an approved user from the cached pending users and count it as approved.
+
+        The user shows up on the cached pages of approved users once they are loaded again, its
+        place in Auth0's order is not known here.
+        """
+        with self._lock:
+            if self._remove_user(PENDING, user_id):
+                self._adjust_totals(USERS, 1)
+
+    def mark_rejected(self, user_id):
+        """
+        Remove a rejected (deleted) user from the cached pages it is on.
+        """
+        with self._lock:
+            if not self._remove_user(PENDING, user_id):
+                self._remove_user(USERS, user_id)
+            if self._roles and self._roles[1]:
+                self._roles[1].pop(user_id, None)
+
+    def _remove_user(self, kind, user_id):
+        """Remove a user from the cached pages of one kind, return whether it was on one of them."""
+        found = sorted(key[1] for key, (_, users, _) in self._pages.items()
+                       if key[0] == kind and any(user.get("user_id") == user_id for user in users))
+        if not found:
+            return False
+        page = found[0]
+
+        # Pages are replaced rather than modified, pages being rendered keep a consistent copy
+        pages = {}
+        for key, (loaded_at, users, total) in self._pages.items():
+            if key[0] != kind or key[1] < page:
+                pages[key] = (loaded_at, users, total)
+            elif key[1] == page:
+                pages[key] = (loaded_at, [user for user in users if user.get("user_id") != user_id], total)
+            # Later pages shift by one user, they are loaded again when viewed
+        self._pages = pages
+        self._adjust_totals(kind, -1)
+        return True
+
+    def _adjust_totals(self, kind, delta):
+        self._pages = {
+            key: (loaded_at, users, max(total + delta, 0)) if key[0] == kind else (loaded_at, users, total)
+            for key, (loaded_at, users, total) in self._pages.items()
+        }
+
+    def invalidate(self):
+        """
+        Drop every cached page, the next view loads from Auth0.
+        """
+        with self._lock:
+            self._pages.clear()
+            self._roles = None
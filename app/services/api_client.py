@@ -1,33 +1,51 @@
 import requests
 import logging
+from app.helpers import fork_safety
 
 logger = logging.getLogger(__name__)
 
 class APIClient:
     """
     A centralized client for making API requests.
+
+    Requests go through one keep-alive session, so the services sharing the client reuse its
+    connections to the prediction API.
     """
 
-    @staticmethod
-    def get(url, params=None, headers=None):
+    def __init__(self, session=None):
+        """
+        Initialize APIClient.
+
+        Args:
+            session (requests.Session): Session to send requests with, a new one when omitted.
+        """
+        self.session = session or requests.Session()
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Start a new session, the pooled connections belong to the parent process.
+        """
+        self.session = requests.Session()
+
+    def get(self, url, params=None, headers=None):
         """
         Sends a GET request to the specified URL.
         """
         try:
-            response = requests.get(url, params=params, headers=headers)
+            response = self.session.get(url, params=params, headers=headers)
             response.raise_for_status()  # Raise an HTTPError for bad responses
             return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"GET request to {url} failed: {str(e)}", exc_info=True)
             return {"error": str(e)}
 
-    @staticmethod
-    def post(url, json=None, headers=None, timeout=10):
+    def post(self, url, json=None, headers=None, timeout=10):
         """
         Sends a POST request to the specified URL.
         """
         try:
-            response = requests.post(url, json=json, headers=headers, timeout=timeout)
+            response = self.session.post(url, json=json, headers=headers, timeout=timeout)
             response.raise_for_status()  # Raise an HTTPError for bad responses
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -1,10 +1,21 @@
 from app.helpers.auth0_helper import (
+    APPROVED_QUERY,
+    PENDING_QUERY,
+    auth0_session,
+    auth0_base_url,
     get_management_api_token,
     get_pending_approvals,
+    get_users_page,
+    iter_users,
+    get_roles,
+    get_role_users,
+    get_user_roles,
     update_user_approval,
     delete_user,
 )
+from app.helpers.session_helper import session_user
 from flask import session
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import requests
 import os
@@ -12,59 +23,142 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Custom claim added by the Auth0 login Action, present in the ID token and in /userinfo
+APPROVED_CLAIM = "https://mobilab.demo.app.com/approved"
+
+# Answers of the role members listing that mean it is not available to this app, for example
+# because of a missing scope
+ROLE_MEMBERS_UNAVAILABLE = (403, 404)
+
+# Concurrent per-user role lookups when role members cannot be listed
+ROLE_LOOKUP_WORKERS = int(os.getenv("AUTH0_ROLE_LOOKUP_WORKERS", 8))
+
+# Concurrent Auth0 updates of a bulk approve or reject
+BULK_UPDATE_WORKERS = int(os.getenv("AUTH0_BULK_WORKERS", 4))
+
 
 def fetch_all_users():
     """
     Fetch all approved users from Auth0 and include their roles from the Management API.
+
+    Roles are resolved by listing the members of each role and joining them with the users in
+    memory, so the number of Auth0 calls depends on the number of roles, not on the number of
+    users. If role members cannot be listed, the roles are looked up per user, a few at a time.
     """
     try:
         # Get the Management API token
         token = get_management_api_token()
 
-        # Define the Auth0 Management API endpoints
-        domain = os.getenv("AUTH0_DOMAIN")
-        query = 'app_metadata.approved:true'
-        users_url = f"https://{domain}/api/v2/users?q={query}&search_engine=v3"
-        roles_url = f"https://{domain}/api/v2/roles"
-
-        # Fetch all users
-        headers = {"Authorization": f"Bearer {token}"}
-        users_response = requests.get(users_url, headers=headers)
-        users_response.raise_for_status()
-        users = users_response.json()
-
-        # Fetch all roles
-        roles_response = requests.get(roles_url, headers=headers)
-        roles_response.raise_for_status()
-        roles = roles_response.json()
-
-        # Create a mapping of role IDs to role names
-        role_mapping = {role["id"]: role["name"] for role in roles}
-        # Process the response to include only relevant fields
-        processed_users = []
-        for user in users:
-            # Fetch roles for the user
-            user_roles_url = f"https://{domain}/api/v2/users/{user['user_id']}/roles"
-            user_roles_response = requests.get(user_roles_url, headers=headers)
-            user_roles_response.raise_for_status()
-            user_roles = user_roles_response.json()
-
-            # Map role IDs to role names
-            user_role_names = user_roles[0]['name'] if user_roles else []
-
-            # Add the user with their roles
-            processed_users.append({
-                "user_id": user.get("user_id"),
-                "email": user.get("email"),
-                "name": user.get("name"),
-                "role": user_role_names,
-            })
-        return processed_users
+        # Fetch all users, page by page
+        users = list(iter_users(APPROVED_QUERY, token))
+
+        user_roles = fetch_role_map(token)
+        if user_roles is None:
+            user_roles = _roles_by_user(users, token)
+        return _with_roles(users, user_roles)
     except requests.RequestException as e:
         logger.error(f"Error fetching all users: {str(e)}")
         raise ValueError("Failed to fetch all users.")
 
 
+def fetch_users_page(page, per_page, user_roles=None):
+    """
+    Fetch one page of approved users with their roles.
+
+    Args:
+        page (int): Zero-based page number.
+        per_page (int): Users per page.
+        user_roles (dict): Role name per user ID, see fetch_role_map. When omitted, the roles of
+            the users on this page are looked up per user.
+
+    Returns:
+        tuple: (users, total number of approved users)
+    """
+    try:
+        token = get_management_api_token()
+        payload = get_users_page(APPROVED_QUERY, token, page, per_page)
+        users = payload["users"]
+        if user_roles is None:
+            user_roles = _roles_by_user(users, token)
+        return _with_roles(users, user_roles), payload.get("total", len(users))
+    except requests.RequestException as e:
+        logger.error(f"Error fetching users page {page}: {str(e)}")
+        raise ValueError("Failed to fetch all users.")
+
+
+def fetch_pending_page(page, per_page):
+    """
+    Fetch one page of users waiting for approval.
+
+    Returns:
+        tuple: (users, total number of pending users)
+    """
+    try:
+        payload = get_users_page(PENDING_QUERY, get_management_api_token(), page, per_page)
+        return payload["users"], payload.get("total", len(payload["users"]))
+    except requests.RequestException as e:
+        logger.error(f"Error fetching pending approvals page {page}: {str(e)}")
+        raise ValueError("Failed to fetch pending approvals.")
+
+
+def fetch_role_map(token=None):
+    """
+    Map every user ID with a role to the name of its first role, one members listing per role.
+
+    Returns:
+        dict: Role name per user ID, or None if role members cannot be listed (for example
+        because of a missing scope).
+
+    Raises:
+        ValueError: If Auth0 fails otherwise, for example when it is rate limiting or down.
+    """
+    try:
+        token = token or get_management_api_token()
+        return _roles_by_member(get_roles(token), token)
+    except requests.HTTPError as e:
+        if e.response is None or e.response.status_code not in ROLE_MEMBERS_UNAVAILABLE:
+            logger.error(f"Error fetching role members: {str(e)}")
+            raise ValueError("Failed to fetch user roles.")
+        logger.warning(f"Could not list role members, looking up roles per user instead: {str(e)}")
+        return None
+    except requests.RequestException as e:
+        logger.error(f"Error fetching role members: {str(e)}")
+        raise ValueError("Failed to fetch user roles.")
+
+
+def _with_roles(users, user_roles):
+    """Keep only the relevant fields of each user and add its role."""
+    return [
+        {
+            "user_id": user.get("user_id"),
+            "email": user.get("email"),
+            "name": user.get("name"),
+            "role": user_roles.get(user.get("user_id"), []),
+        }
+        for user in users
+    ]
+
+
+def _roles_by_member(roles, token):
+    """Map each user ID to the name of its first role, using one members listing per role."""
+    user_roles = {}
+    for role in roles:
+        for member in get_role_users(role["id"], token):
+            user_roles.setdefault(member["user_id"], role["name"])
+    return user_roles
+
+
+def _roles_by_user(users, token):
+    """Map each user ID to the name of its first role, with a bounded number of concurrent lookups."""
+    def first_role(user_id):
+        roles = get_user_roles(user_id, token)
+        return user_id, roles[0]["name"] if roles else []
+
+    user_ids = [user["user_id"] for user in users]
+    with ThreadPoolExecutor(max_workers=ROLE_LOOKUP_WORKERS) as executor:
+        return dict(executor.map(first_role, user_ids))
+
+
 def fetch_pending_approvals():
     """
     Fetch and process pending approvals from Auth0.
@@ -95,7 +189,10 @@ def approve_user(user_id):
 
 def reject_user(user_id):
     """
-    Reject a user by updating their approval status in Auth0.
+    Reject a user by marking them as not approved and deleting them from Auth0.
+
+    The approval flag is set first, so a user whose delete fails is recorded as rejected rather
+    than looking like one that was never reviewed.
     """
     try:
         update_user_approval(user_id, False)
@@ -107,6 +204,33 @@ def reject_user(user_id):
         raise ValueError(f"Failed to reject user: {str(e)}")
 
 
+def bulk_update_users(user_ids, approve):
+    """
+    Approve or reject many users, with a bounded number of concurrent Auth0 requests.
+
+    Rate limited requests are retried after the delay Auth0 asks for, see management_request.
+
+    Args:
+        user_ids (list): Auth0 user IDs.
+        approve (bool): True to approve the users, False to reject them.
+
+    Returns:
+        dict: Per user ID, {"success": bool, "message": str}.
+    """
+    action = approve_user if approve else reject_user
+
+    def update(user_id):
+        # One failing user must not abort the others, so every failure becomes that user's result
+        try:
+            return user_id, action(user_id)
+        except (ValueError, requests.RequestException) as e:
+            logger.error(f"Error updating user {user_id} in bulk: {str(e)}")
+            return user_id, {"success": False, "message": str(e)}
+
+    with ThreadPoolExecutor(max_workers=BULK_UPDATE_WORKERS, thread_name_prefix="auth0-bulk") as executor:
+        return dict(executor.map(update, dict.fromkeys(user_ids)))
+
+
 def handle_auth_callback(token):
     """
     Handle the Auth0 callback by validating the token and checking user approval status.
@@ -118,18 +242,20 @@ def handle_auth_callback(token):
             logger.error("Nonce is missing from the session.")
             raise ValueError("Invalid session state: missing nonce.")
 
-        # Fetch user info from Auth0
-        userinfo = get_user_info(token["access_token"])
+        userinfo = id_token_claims(token)
+        if userinfo is None:
+            # Fall back to Auth0's /userinfo when the ID token lacks the claims the app needs
+            userinfo = get_user_info(token["access_token"])
         logger.debug(f"User info retrieved: {userinfo}")
 
         # Check if the user is approved
-        approved = userinfo.get("https://mobilab.demo.app.com/approved", False)
+        approved = userinfo.get(APPROVED_CLAIM, False)
         if not approved:
             logger.warning(f"User {userinfo.get('sub')} is not approved.")
             raise ValueError("User is not approved.")
 
-        # Store the user info in the session
-        session["user"] = userinfo
+        # Store the claims the application needs in the session
+        session["user"] = session_user(userinfo)
         logger.info(f"User {userinfo.get('sub')} logged in successfully.")
         return {"success": True, "message": "User logged in successfully."}
     except KeyError as e:
@@ -140,11 +266,26 @@ def handle_auth_callback(token):
         raise ValueError(f"Failed to handle Auth0 callback: {str(e)}")
 
 
+def id_token_claims(token):
+    """
+    Return the claims of the token's ID token, or None if they cannot be used.
+
+    authorize_access_token verifies the ID token locally (signature against Auth0's JWKS, which
+    the OAuth client caches and fetches again when it sees an unknown key ID, issuer, audience,
+    expiry and nonce) and stores its claims under "userinfo". Logins then need no /userinfo call,
+    as long as the ID token carries the custom approval claim.
+    """
+    claims = token.get("userinfo")
+    if not claims or APPROVED_CLAIM not in claims:
+        return None
+    return dict(claims)
+
+
 def get_user_info(access_token):
     """Fetch user info from Auth0 using the access token."""
     try:
-        response = requests.get(
-            f"https://{os.getenv('AUTH0_DOMAIN')}/userinfo",
+        response = auth0_session.get(
+            f"{auth0_base_url()}/userinfo",
             headers={"Authorization": f"Bearer {access_token}"}
         )
         response.raise_for_status()
@@ -0,0 +1,105 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from app.helpers.cache import ByteCache
+from app.helpers.pdf_generator import html_to_pdf
+from app.helpers.render_pool import RenderPool, RenderPoolBusy
+
+logger = logging.getLogger(__name__)
+
+
+class BulkReportService:
+    """
+    Service for rendering many PDF reports for a single export.
+
+    Reports are laid out in the render pool with at most `concurrency` of them in flight, and
+    each PDF is handed to the caller as soon as it is finished. Jobs are consumed lazily, so only
+    the reports being rendered are held in memory, however many were requested.
+    """
+
+    def __init__(self, render_pool: RenderPool, pdf_cache: ByteCache = None, concurrency=2, max_reports=100):
+        """
+        Initialize BulkReportService with required dependencies.
+
+        Args:
+            render_pool (RenderPool): Pool that runs the WeasyPrint layout.
+            pdf_cache (ByteCache): Optional cache of generated PDFs.
+            concurrency (int): Maximum number of reports of one export in the render pool at a time.
+            max_reports (int): Maximum number of reports in one export.
+        """
+        self.render_pool = render_pool
+        self.pdf_cache = pdf_cache
+        self.concurrency = max(1, concurrency)
+        self.max_reports = max_reports
+
+    def render(self, jobs):
+        """
+        Render PDF reports in parallel.
+
+        Args:
+            jobs (iterable): (name, report key, build job) tuples. The build job returns the report
+                HTML and render options, it is only called when the PDF is not cached. The iterable
+                is only advanced when a slot is free, which keeps memory bounded.
+
+        Yields:
+            tuple: (name, PDF bytes or None, error message or None) in the order the reports finish.
+        """
+        pending = {}  # future -> (name, report key, submitted at)
+        jobs = iter(jobs)
+        exhausted = False
+
+        while pending or not exhausted:
+            while not exhausted and len(pending) < self.concurrency:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                result = self._submit(pending, *job)
+                if result:
+                    yield result
+
+            if not pending:
+                continue
+            done, _ = wait(pending, timeout=self.render_pool.job_timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield self._result(future, *pending.pop(future))
+            if not done:
+                yield from self._expire(pending)
+
+    def _submit(self, pending, name, report_key, build_job):
+        """Queue a report, returning its result right away when it is cached or cannot be queued."""
+        cached = self.pdf_cache.get(report_key) if self.pdf_cache else None
+        if cached is not None:
+            return name, cached, None
+        try:
+            html_content, render_options = build_job()
+        except Exception as e:
+            logger.error(f"Bulk report {name} could not be built: {e}", exc_info=True)
+            return name, None, "The report could not be generated."
+        try:
+            future = self.render_pool.submit(html_to_pdf, html_content, **render_options)
+        except RenderPoolBusy as e:
+            logger.error(f"Bulk report {name} was rejected: {e}")
+            return name, None, "The report service is busy."
+        pending[future] = (name, report_key, time.monotonic())
+        return None
+
+    def _result(self, future, name, report_key, submitted_at):
+        try:
+            pdf = future.result()
+        except Exception as e:
+            logger.error(f"Bulk report {name} failed: {e}", exc_info=True)
+            return name, None, "The report could not be generated."
+        if self.pdf_cache:
+            self.pdf_cache.put(report_key, pdf)
+        return name, pdf, None
+
+    def _expire(self, pending):
+        """Give up on reports that have been rendering for longer than the pool's job timeout."""
+        cutoff = time.monotonic() - self.render_pool.job_timeout
+        for future, (name, _, submitted_at) in list(pending.items()):
+            if submitted_at <= cutoff:
+                future.cancel()
+                del pending[future]
+                logger.error(f"Bulk report {name} timed out.")
+                yield name, None, "The report timed out."
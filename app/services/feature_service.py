@@ -1,23 +1,44 @@
 import json
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
+import base64
 from app.dao.model_dao import ModelDAO
+from app.helpers.cache import ByteCache, content_key
+from app.helpers.charts import CHART_MIMETYPES, render_contributions
+from app.helpers.lazy_imports import pandas as pd
+from app.helpers.render_pool import RenderPool
 from flask import current_app as app
 from io import BytesIO
 
+# Identifies the figure size and styling used for contributions plots.
+# Bump it whenever the rendering changes so cached plots are not reused.
+PLOT_PRESET = "8x6-v1"
+
 
 class FeatureService:
     """Service for handling feature-related operations."""
 
-    def __init__(self, model_dao: ModelDAO):
+    def __init__(self, model_dao: ModelDAO, plot_cache: ByteCache = None, chart_format: str = "png",
+                 render_pool: RenderPool = None):
         """
         Initialize FeatureService with required dependencies.
 
         Args:
             model_dao (ModelDAO): DAO for interacting with the database.
+            plot_cache (ByteCache): Optional cache for rendered contributions plots.
+            chart_format (str): Format of the contributions plot, "png" or "svg".
+            render_pool (RenderPool): Optional process pool for matplotlib rendering.
         """
+        if chart_format not in CHART_MIMETYPES:
+            raise ValueError(f"Unsupported chart format: {chart_format}")
         self.model_dao = model_dao
+        self.plot_cache = plot_cache
+        self.chart_format = chart_format
+        self.render_pool = render_pool
+
+    @property
+    def contributions_plot_mimetype(self) -> str:
+        """MIME type of the plots returned by render_contributions_plot."""
+        return CHART_MIMETYPES[self.chart_format]
 
     def extract_and_validate_features(self, form, model_name: str) -> dict:
         """
@@ -98,61 +119,72 @@ class FeatureService:
         Returns:
             tuple: Path to contributions plot and explanation text.
         """
-        contributions = prediction_result.get("contributions", {}).copy()
+        contributions = prediction_result.get("contributions", {})
         prediction = prediction_result.get("prediction", 0)
 
         if not contributions:
             return None, "No contributions are available for this prediction."
 
         # Extract and adjust contributions
-        bias_term = contributions.pop("BiasTerm", 0)
-        adjusted_contributions = {feature: importance + bias_term for feature, importance in contributions.items()}
+        adjusted_contributions, bias_term = self._adjust_contributions(contributions)
 
         # Generate plot
-        plot_buffer = self._generate_contributions_plot(adjusted_contributions, prediction)
+        plot_buffer = BytesIO(self.render_contributions_plot(contributions, prediction))
 
         # Generate explanation text
         explanation = self._generate_explanation_text(adjusted_contributions, bias_term, prediction, feature_names)
 
         return plot_buffer, explanation
 
+    def render_contributions_plot(self, contributions: dict, prediction: int) -> bytes:
+        """
+        Return the contributions plot for a prediction, rendering it only on a cache miss.
+
+        Args:
+            contributions: Raw contributions as returned by the prediction API, including the bias term.
+            prediction: The predicted class.
+
+        Returns:
+            bytes: The rendered plot image.
+        """
+        adjusted_contributions, _ = self._adjust_contributions(contributions)
+
+        def render():
+            return self._generate_contributions_plot(adjusted_contributions, prediction).getvalue()
+
+        if not self.plot_cache:
+            return render()
+
+        key = content_key("contributions_plot", adjusted_contributions, prediction, self.chart_format, PLOT_PRESET)
+        return self.plot_cache.get_or_create(key, render)
+
+    def contributions_plot_data_uri(self, contributions: dict, prediction: int) -> str:
+        """
+        Return the contributions plot as a Base64 data URI that can be embedded in HTML and PDFs.
+
+        Args:
+            contributions: Raw contributions as returned by the prediction API, including the bias term.
+            prediction: The predicted class.
+
+        Returns:
+            str: The data URI of the rendered plot.
+        """
+        plot_data = base64.b64encode(self.render_contributions_plot(contributions, prediction)).decode("utf-8")
+        return f"data:{self.contributions_plot_mimetype};base64,{plot_data}"
+
+    def _adjust_contributions(self, contributions: dict) -> tuple:
+        """Fold the bias term into every feature contribution and return (adjusted, bias_term)."""
+        contributions = dict(contributions)
+        bias_term = contributions.pop("BiasTerm", 0)
+        adjusted_contributions = {feature: importance + bias_term for feature, importance in contributions.items()}
+        return adjusted_contributions, bias_term
+
     def _generate_contributions_plot(self, contributions: dict, prediction: int) -> BytesIO:
         """Generate a plot for feature contributions and return it as a BytesIO object."""
-        # Sort contributions by absolute importance
-        sorted_contributions = sorted(contributions.items(), key=lambda x: abs(x[1]), reverse=True)
-        features = [feature for feature, _ in sorted_contributions]
-        importances = [importance for _, importance in sorted_contributions]
-
-        # Create the plot
-        fig, ax = plt.subplots(figsize=(8, 6))
-        bars = ax.barh(features, importances, color=["#E73C0D" if imp > 0 else "#0090A5" for imp in importances])
-        ax.invert_yaxis()
-        ax.set_xlabel("Importance")
-        ax.set_title(f"Feature Contributions (Prediction: {'Disease' if prediction == 1 else 'No Disease'})")
-
-        # Add annotations to bars
-        for bar, importance in zip(bars, importances):
-            ax.text(
-                bar.get_width() + (0.002 if importance > 0 else -0.002),
-                bar.get_y() + bar.get_height() / 2,
-                f"{importance:.2f}",
-                va="center",
-                ha="left" if importance > 0 else "right",
-                fontsize=10,
-                color="black"
-            )
-
-        min_importance = min(importances)
-        max_importance = max(importances)
-        ax.set_xlim(min_importance * 1.2 if min_importance < 0 else 0, max_importance * 1.2 if max_importance > 0 else 0)
-
-        # Save the plot to a BytesIO buffer
-        buffer = BytesIO()
-        plt.savefig(buffer, format="png", bbox_inches="tight")
-        plt.close(fig)
-        buffer.seek(0)  # Reset buffer pointer to the beginning
-
-        return buffer
+        # SVG charts are cheap to build, only matplotlib renders are worth a trip to the render pool
+        if self.render_pool and self.chart_format == "png":
+            return BytesIO(self.render_pool.run(render_contributions, contributions, prediction, self.chart_format))
+        return BytesIO(render_contributions(contributions, prediction, self.chart_format))
 
     def _generate_explanation_text(self, contributions: dict, bias_term: float, prediction: int, feature_names: list) -> str:
         """Generate textual explanation for contributions."""
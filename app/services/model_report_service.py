@@ -0,0 +1,80 @@
+import json
+import logging
+import threading
+from flask import request
+from app.dao.model_dao import ModelDAO
+from app.helpers import fork_safety
+from app.helpers.report_builder import ReportBuilder, ReportDirector
+
+logger = logging.getLogger(__name__)
+
+
+class ModelReportService:
+    """Service for the per-model report sections (metadata, plots and classification report)."""
+
+    def __init__(self, model_dao: ModelDAO):
+        """
+        Initialize ModelReportService with required dependencies.
+
+        Args:
+            model_dao (ModelDAO): DAO for interacting with the database.
+        """
+        self.model_dao = model_dao
+        self._sections = {}  # (model name, URL root) -> (model version, sections)
+        self._lock = threading.Lock()
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Replace the lock inherited from the parent process, which may have been held at fork time.
+        """
+        self._lock = threading.Lock()
+
+    def get_model_sections(self, model_name: str, metadata: dict = None) -> list:
+        """
+        Return the model sections, rendering them only once per model version.
+
+        The sections are shared by the /models page and every PDF report on the model. They are
+        rebuilt when the model's version changes.
+
+        Args:
+            model_name: Name of the model.
+            metadata: The model metrics, fetched when omitted.
+
+        Returns:
+            list: The "Model Metadata", "Model Plots" and "Model Report" sections.
+        """
+        if metadata is None:
+            metadata = self.model_dao.get_metrics(model_name)
+        version = metadata.get("version")
+        # Plot URLs are absolute, so fragments are kept per host the app is served on
+        key = (model_name, request.url_root)
+
+        with self._lock:
+            cached = self._sections.get(key)
+        if cached and version is not None and cached[0] == version:
+            return cached[1]
+
+        plots = self.model_dao.get_plots(model_name)
+        report = json.loads(self.model_dao.get_report(model_name)["report"])
+        builder = ReportBuilder()
+        director = ReportDirector(builder)
+        # The builder parses trainingShape in place, keep the caller's metadata untouched
+        sections = director.build_model_report(dict(metadata), plots, report).get_sections()
+
+        if version is not None:
+            with self._lock:
+                self._sections[key] = (version, sections)
+            logger.info(f"Rendered report sections for model {model_name} version {version}.")
+        return sections
+
+    def invalidate(self, model_name: str = None):
+        """
+        Drop the cached sections of one model, or of every model.
+        """
+        with self._lock:
+            if model_name is None:
+                self._sections.clear()
+            else:
+                for key in [key for key in self._sections if key[0] == model_name]:
+                    del self._sections[key]
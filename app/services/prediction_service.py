@@ -1,6 +1,9 @@
 import logging
 from app.services.feature_service import FeatureService
 from app.services.api_client import APIClient
+from app.helpers.write_behind import WriteBehindBuffer
+from datetime import datetime, timezone
+import json
 import os
 from io import BytesIO
 import base64
@@ -11,24 +14,27 @@ logger = logging.getLogger(__name__)
 class PredictionService:
     """Service for handling prediction workflows."""
 
-    def __init__(self, api_client: APIClient, feature_service: FeatureService):
+    def __init__(self, api_client: APIClient, feature_service: FeatureService, history_buffer: WriteBehindBuffer = None):
         """
         Initialize PredictionService with required dependencies.
 
         Args:
             api_client (APIClient): Client for making API requests.
             feature_service (FeatureService): Service for handling feature-related operations.
+            history_buffer (WriteBehindBuffer): Optional buffer that records successful predictions in the history.
         """
         self.api_client = api_client
         self.feature_service = feature_service
+        self.history_buffer = history_buffer
 
-    def process_prediction_request(self, form, model_name: str) -> dict:
+    def process_prediction_request(self, form, model_name: str, user_id: str = None) -> dict:
         """
         Process the entire prediction workflow.
 
         Args:
             form: Flask form containing input data.
             model_name: Name of the model to use.
+            user_id: Auth0 ID of the user making the prediction, recorded in the history.
 
         Returns:
             dict: Prediction results and processed contributions.
@@ -50,10 +56,13 @@ class PredictionService:
             # Convert plot to Base64
             plot_data = base64.b64encode(plot_buffer.getvalue()).decode("utf-8") if plot_buffer else None
 
+            self._record_prediction(user_id, model_name, prediction_result["prediction"], features, contributions, explanation)
+
             return {
                 "success": True,
                 "prediction": prediction_result["prediction"],
                 "contributions_plot": plot_data,
+                "contributions_plot_mimetype": self.feature_service.contributions_plot_mimetype,
                 "contributions" : contributions,
                 "explanation_text": explanation,
                 "features": features,
@@ -62,6 +71,20 @@ class PredictionService:
             logger.error("Error processing prediction request", exc_info=True)
             return {"success": False, "error": str(e)}
 
+    def _record_prediction(self, user_id, model_name, prediction, features, contributions, explanation):
+        """Queue a successful prediction for the history table, off the request path."""
+        if not self.history_buffer:
+            return
+        self.history_buffer.append((
+            user_id,
+            model_name,
+            prediction,
+            json.dumps(features),
+            json.dumps(contributions),
+            explanation,
+            datetime.now(timezone.utc).replace(tzinfo=None),
+        ))
+
     def _make_prediction(self, features: dict, model_name: str) -> dict:
         """Make a prediction using the external API."""
         try:
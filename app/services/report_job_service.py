@@ -0,0 +1,181 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.helpers import fork_safety
+from app.helpers.pdf_generator import html_to_pdf
+from app.helpers.render_pool import RenderPool
+from app.helpers.state_store import StateStore
+from app.helpers.cache import ByteCache
+from app.helpers.private_dir import app_data_dir
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class ReportJobRejected(RuntimeError):
+    """Raised when a report job cannot be accepted because a concurrency cap is reached."""
+
+
+class ReportJobService:
+    """
+    Service for generating PDF reports in the background.
+
+    Job records live in a StateStore without an in-process tier, so any worker on the host can
+    answer status requests for any job. Finished PDFs are written to a spool directory shared by
+    the workers and served from disk. Jobs expire `job_ttl` seconds after they were submitted.
+    """
+
+    def __init__(self, job_store: StateStore, render_pool: RenderPool, pdf_cache: ByteCache = None,
+                 result_dir=None, max_workers=2, max_pending=16, max_jobs_per_user=2, job_ttl=600):
+        """
+        Initialize ReportJobService with required dependencies.
+
+        Args:
+            job_store (StateStore): Shared store for job records.
+            render_pool (RenderPool): Pool that runs the WeasyPrint layout.
+            result_dir (str): Directory for finished PDFs, defaults to report_jobs in the app data directory.
+            result_dir (str): Directory for finished PDFs.
+            max_workers (int): Number of jobs waiting on the render pool at the same time.
+            max_pending (int): Maximum number of unfinished jobs in this process.
+            max_jobs_per_user (int): Maximum number of unfinished jobs per user in this process.
+            job_ttl (float): Seconds after which jobs and their PDFs are removed.
+        """
+        self.job_store = job_store
+        self.render_pool = render_pool
+        self.pdf_cache = pdf_cache
+        self.result_dir = result_dir or os.path.join(app_data_dir(), "report_jobs")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_jobs_per_user = max_jobs_per_user
+        self.job_ttl = job_ttl
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = {}  # owner -> number of unfinished jobs
+        os.makedirs(self.result_dir, mode=0o700, exist_ok=True)
+        fork_safety.register(self)
+
+    def after_fork(self):
+        """
+        Forget the parent's job threads and pending counts, this process starts its own.
+        """
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="report-job")
+            return self._executor
+
+    def submit(self, owner, report_key, html_content, **render_options):
+        """
+        Queue a PDF report job.
+
+        Args:
+            owner (str): Auth0 ID of the user requesting the report.
+            report_key (str): Content key of the report, used for the PDF cache.
+            html_content (str): The rendered report HTML.
+            **render_options: Keyword arguments for html_to_pdf, see pdf_render_options.
+
+        Returns:
+            str: The job ID.
+
+        Raises:
+            ReportJobRejected: If the process or the user has too many unfinished jobs.
+        """
+        self._remove_expired_results()
+
+        job = {"owner": owner, "status": QUEUED, "error": None, "submitted_at": time.time()}
+        cached = self.pdf_cache.get(report_key) if self.pdf_cache else None
+        if cached is not None:
+            job_id = self.job_store.save(dict(job, status=DONE))
+            self._write_result(job_id, cached)
+            return job_id
+
+        with self._lock:
+            if sum(self._pending.values()) >= self.max_pending:
+                raise ReportJobRejected("Too many reports are being generated. Please try again later.")
+            if self._pending.get(owner, 0) >= self.max_jobs_per_user:
+                raise ReportJobRejected("You already have reports being generated. Please wait for them to finish.")
+            self._pending[owner] = self._pending.get(owner, 0) + 1
+
+        try:
+            job_id = self.job_store.save(job)
+            self._get_executor().submit(self._run, job_id, job, report_key, html_content, render_options)
+        except Exception:
+            self._release(owner)
+            raise
+        return job_id
+
+    def _run(self, job_id, job, report_key, html_content, render_options):
+        try:
+            self.job_store.save(dict(job, status=RUNNING), job_id)
+            pdf = self.render_pool.run(html_to_pdf, html_content, **render_options)
+            if self.pdf_cache:
+                self.pdf_cache.put(report_key, pdf)
+            self._write_result(job_id, pdf)
+            self.job_store.save(dict(job, status=DONE), job_id)
+        except Exception as e:
+            logger.error(f"Report job {job_id} failed: {e}", exc_info=True)
+            self.job_store.save(dict(job, status=FAILED, error="The report could not be generated."), job_id)
+        finally:
+            self._release(job["owner"])
+
+    def _release(self, owner):
+        with self._lock:
+            remaining = self._pending.get(owner, 0) - 1
+            if remaining > 0:
+                self._pending[owner] = remaining
+            else:
+                self._pending.pop(owner, None)
+
+    def get_job(self, job_id, owner):
+        """
+        Return the job record, or None if it does not exist, expired or belongs to another user.
+        """
+        job = self.job_store.load(job_id)
+        if not job or job.get("owner") != owner:
+            return None
+        return job
+
+    def result_path(self, job_id):
+        """
+        Return the path of a finished job's PDF, or None if it is not available.
+        """
+        if not re.fullmatch(r"[\w-]+", job_id or ""):
+            return None
+        path = self._result_path(job_id)
+        return path if os.path.exists(path) else None
+
+    def _result_path(self, job_id):
+        return os.path.join(self.result_dir, f"{job_id}.pdf")
+
+    def _write_result(self, job_id, pdf):
+        # Write to a temporary file and rename so other workers never serve partial PDFs
+        fd, tmp_path = tempfile.mkstemp(dir=self.result_dir, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp_path, self._result_path(job_id))
+
+    def _remove_expired_results(self):
+        """Delete PDFs of expired jobs from the spool directory."""
+        cutoff = time.time() - self.job_ttl
+        try:
+            with os.scandir(self.result_dir) as it:
+                for entry in it:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            pass
+        except OSError as e:
+            logger.warning(f"Failed to clean up report results: {e}")
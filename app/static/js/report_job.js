@@ -0,0 +1,61 @@
+var downloadButton = document.getElementById('downloadReport');
+var reportStatus = document.getElementById('reportStatus');
+// Polling starts at once a second and backs off to once every five seconds
+var POLL_INTERVAL_MS = 1000;
+var MAX_POLL_INTERVAL_MS = 5000;
+var POLL_BACKOFF = 1.5;
+
+function pollReportJob(statusUrl, downloadUrl, interval) {
+    interval = interval || POLL_INTERVAL_MS;
+    var pollAgain = function() {
+        var next = Math.min(interval * POLL_BACKOFF, MAX_POLL_INTERVAL_MS);
+        setTimeout(function() { pollReportJob(statusUrl, downloadUrl, next); }, interval);
+    };
+
+    fetch(statusUrl, { credentials: 'same-origin' })
+        .then(function(response) {
+            // Rate limited, keep the job and ask again later
+            if (response.status === 429) {
+                return null;
+            }
+            return response.json();
+        })
+        .then(function(job) {
+            if (job === null) {
+                pollAgain();
+            } else if (job.status === 'done') {
+                reportStatus.textContent = '';
+                window.location = downloadUrl;
+            } else if (job.status === 'failed' || job.error) {
+                reportStatus.textContent = job.error || 'The report could not be generated.';
+            } else {
+                pollAgain();
+            }
+        })
+        .catch(function() {
+            reportStatus.textContent = 'Lost track of the report. Please try again.';
+        });
+}
+
+downloadButton.addEventListener('click', function(event) {
+    // Without JavaScript the link falls back to the synchronous download
+    event.preventDefault();
+    reportStatus.textContent = 'Generating your report...';
+
+    fetch(downloadButton.dataset.submitUrl, {
+        method: 'POST',
+        credentials: 'same-origin',
+        headers: { 'X-CSRFToken': downloadButton.dataset.csrfToken }
+    })
+        .then(function(response) { return response.json(); })
+        .then(function(job) {
+            if (!job.job_id) {
+                reportStatus.textContent = job.error || 'The report could not be generated.';
+                return;
+            }
+            pollReportJob(job.status_url, job.download_url);
+        })
+        .catch(function() {
+            reportStatus.textContent = 'The report could not be requested. Please try again.';
+        });
+});
@@ -0,0 +1,85 @@
+"""
+Benchmark the Auth0 paths of the admin page and the login callback against the local stand-in.
+
+Starts benchmarks/fake_auth0.py in a background thread with the given tenant size, latency and
+rate limit, points the Auth0 helpers at it and reports timings and Auth0 request counts.
+Run from the repository root:
+
+    python -m benchmarks.bench_auth0 --users 1000 --latency 0.05 --rate-limit 50
+"""
+import argparse
+import logging
+import os
+import statistics
+import time
+from benchmarks.fake_auth0 import create_fake_auth0, serve_in_thread
+
+
+def timed(name, fn, fake, repeat=1):
+    """Run `fn` `repeat` times and print its median duration and the Auth0 requests it made."""
+    durations = []
+    fake.request_counts.clear()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    requests_made = sum(fake.request_counts.values())
+    print(f"{name:>32}: median {statistics.median(durations):8.1f} ms, {requests_made / repeat:6.1f} Auth0 requests per run")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500, help="Number of seeded users.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every Auth0 response.")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Auth0 requests per second before 429.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement.")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    fake = create_fake_auth0(users=args.users, latency=args.latency, rate_limit=args.rate_limit)
+    server, base_url = serve_in_thread(fake)
+    os.environ.update({"AUTH0_BASE_URL": base_url, "AUTH0_DOMAIN": "fake-auth0.local",
+                       "MGMT_API_CLIENT_ID": "bench", "MGMT_API_CLIENT_SECRET": "bench"})
+
+    # Imported after the environment is set, some settings are read at import time
+    from app.helpers import auth0_helper
+    from app.services import auth_service
+    from app.services.admin_directory_service import AdminDirectoryService
+
+    try:
+        print(f"Fake Auth0 at {base_url} with {args.users} users, {args.latency * 1000:.0f} ms latency")
+
+        def cold_token():
+            auth0_helper.management_token_cache.invalidate()
+            return auth0_helper.get_management_api_token()
+
+        timed("management token (cold)", cold_token, fake)
+        timed("management token (cached)", auth0_helper.get_management_api_token, fake, args.repeat)
+        timed("fetch_all_users", auth_service.fetch_all_users, fake, args.repeat)
+        timed("get_pending_approvals", auth0_helper.get_pending_approvals, fake, args.repeat)
+
+        directory = AdminDirectoryService(ttl=60)
+        timed("admin page (cold)", directory.get_directory, fake)
+        timed("admin page (cached)", directory.get_directory, fake, args.repeat)
+
+        def login():
+            token = auth0_helper.auth0_session.post(f"{base_url}/oauth/token", json={
+                "grant_type": "authorization_code", "code": _authorization_code(base_url, auth0_helper.auth0_session)})
+            return auth_service.get_user_info(token.json()["access_token"])
+
+        timed("login (code exchange + userinfo)", login, fake, args.repeat)
+
+        pending = [user["user_id"] for user in auth0_helper.get_pending_approvals()][:20]
+        timed(f"bulk approve {len(pending)} users", lambda: auth_service.bulk_update_users(pending, approve=True), fake)
+    finally:
+        server.shutdown()
+
+
+def _authorization_code(base_url, session):
+    response = session.get(f"{base_url}/authorize", params={"redirect_uri": "http://localhost/callback"}, allow_redirects=False)
+    return response.headers["Location"].split("code=")[1].split("&")[0]
+
+
+if __name__ == "__main__":
+    main()
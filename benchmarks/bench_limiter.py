@@ -0,0 +1,78 @@
+"""
+Benchmark the cost of rate limiting per request.
+
+Every request checks the default limits ("200 per day", "50 per hour") and the route's own limit,
+so each request is three fixed-window hits. Measures that cost for the per-process `memory://`
+storage and the SQLite storage the workers share, in one process and with several processes
+hitting the same database at once, the way gunicorn workers do. Run from the repository root:
+
+    python -m benchmarks.bench_limiter --requests 2000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from limits import parse_many
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+# Registers the sqlite:// storage
+from app.helpers import rate_limit_storage
+
+LIMITS = parse_many("200 per day; 50 per hour; 20 per minute")
+
+
+def run_requests(uri, requests, clients=50):
+    """
+    Check the limits of `requests` requests spread over `clients` addresses.
+
+    Returns:
+        list: Duration of every request's checks in microseconds.
+    """
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    durations = []
+    for i in range(requests):
+        client = f"10.0.{os.getpid() % 256}.{i % clients}"
+        start = time.perf_counter()
+        for item in LIMITS:
+            limiter.hit(item, "main.predict", client)
+        durations.append((time.perf_counter() - start) * 1_000_000)
+    return durations
+
+
+def report(name, durations, elapsed):
+    durations = sorted(durations)
+    p99 = durations[int(len(durations) * 0.99) - 1]
+    print(f"{name:>28}: median {statistics.median(durations):7.1f} us, p99 {p99:7.1f} us, "
+          f"{len(durations) / elapsed:8.0f} requests/s")
+
+
+def _worker(args):
+    return run_requests(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per process.")
+    parser.add_argument("--workers", type=int, default=4, help="Processes sharing the SQLite storage.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sqlite_uri = rate_limit_storage.sqlite_uri(os.path.join(tmp_dir, "limits.sqlite3"))
+        print(f"{len(LIMITS)} limit checks per request")
+
+        for name, uri in (("memory://", "memory://"), ("sqlite:// (1 process)", sqlite_uri)):
+            start = time.perf_counter()
+            durations = run_requests(uri, args.requests)
+            report(name, durations, time.perf_counter() - start)
+
+        with multiprocessing.Pool(args.workers) as pool:
+            start = time.perf_counter()
+            results = pool.map(_worker, [(sqlite_uri, args.requests)] * args.workers)
+            elapsed = time.perf_counter() - start
+        report(f"sqlite:// ({args.workers} processes)", [d for result in results for d in result], elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark PDF report generation.
+
+Compares rendering with the stylesheet and fonts loaded for every PDF (the old behaviour) against
+rendering with the per-process resources from `report_resources`. Run from the repository root:
+
+    python -m benchmarks.bench_pdf --renders 20
+"""
+import argparse
+import os
+import statistics
+import time
+from flask import Flask
+from app.helpers import pdf_generator
+from app.helpers.report_builder import ReportBuilder, ReportDirector
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+
+PARAMETERS = {"age": 54, "sex": 1, "cp": 2, "trestbps": 130, "chol": 246, "thalach": 150}
+METADATA = {"version": "1", "accuracy": 0.87, "trainingShape": '{"rows": 303, "columns": 13}'}
+PLOTS = {"auc": "static/plots/auc.png", "aucpr": "static/plots/aucpr.png", "shap": "static/plots/shap.png"}
+
+
+def _classification_report(classes):
+    metrics = {"precision": 0.86, "recall": 0.84, "f1-score": 0.85, "support": 30}
+    report = {f"class {i}": dict(metrics) for i in range(classes)}
+    report.update({"accuracy": 0.85, "macro avg": dict(metrics), "weighted avg": dict(metrics)})
+    return report
+
+
+def build_report_html(app, classes):
+    """Render the HTML of a representative report."""
+    with app.test_request_context("/", base_url="http://localhost:5000/"):
+        director = ReportDirector(ReportBuilder())
+        report = director.build_pdf_report(
+            explanation="The prediction is mostly driven by the chest pain type and the maximum heart rate.",
+            contribution_image_path="static/contributions_plots/contributions_plot.png",
+            parameters=PARAMETERS,
+            form=None,
+            metadata=dict(METADATA),
+            plots=PLOTS,
+            report=_classification_report(classes),
+        )
+        return pdf_generator.render_report_html(report), pdf_generator.pdf_render_options()
+
+
+def time_renders(html, options, renders, reuse_resources):
+    """Return the duration of every render in milliseconds."""
+    durations = []
+    for _ in range(renders):
+        if not reuse_resources:
+            pdf_generator._report_resources = None
+        start = time.perf_counter()
+        pdf_generator.html_to_pdf(html, **options)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=10, help="Number of PDFs per scenario.")
+    parser.add_argument("--classes", type=int, default=10, help="Number of classes in the model report.")
+    args = parser.parse_args()
+
+    app = Flask("bench", template_folder=os.path.join(APP_DIR, "templates"), static_folder=os.path.join(APP_DIR, "static"))
+    html, options = build_report_html(app, args.classes)
+
+    for name, reuse in (("reload per PDF", False), ("shared resources", True)):
+        durations = time_renders(html, options, args.renders, reuse)
+        print(
+            f"{name:>17}: median {statistics.median(durations):7.1f} ms, "
+            f"min {min(durations):7.1f} ms, max {max(durations):7.1f} ms over {args.renders} PDFs"
+        )
+
+
+if __name__ == "__main__":
+    main()
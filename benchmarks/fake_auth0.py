@@ -0,0 +1,293 @@
+"""
+Local stand-in for the Auth0 endpoints the application uses.
+
+Serves the login flow (/authorize, /oauth/token, /userinfo, OIDC discovery and JWKS) and the
+Management API calls of auth0_helper (users, roles and role members), backed by seeded
+in-memory users. Latency and rate limiting can be injected to reproduce a real tenant.
+
+Point the application at it with AUTH0_BASE_URL:
+
+    python -m benchmarks.fake_auth0 --port 8765 --users 500 --latency 0.05 --rate-limit 50
+    AUTH0_BASE_URL=http://127.0.0.1:8765 flask run
+"""
+import argparse
+import random
+import re
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+from authlib.jose import JsonWebKey, jwt
+from flask import Flask, abort, jsonify, redirect, request
+
+NAMESPACE = "https://mobilab.demo.app.com"
+SEARCH_RESULT_LIMIT = 1000
+ROLES = [{"id": "rol_admin", "name": "admin", "description": "Administrators"},
+         {"id": "rol_user", "name": "user", "description": "Clinicians"}]
+
+
+def seed_users(count, seed=0, pending_ratio=0.2, admin_ratio=0.05):
+    """
+    Generate `count` users deterministically.
+
+    Returns:
+        tuple: (users by ID, role IDs by user ID)
+    """
+    rng = random.Random(seed)
+    users, user_roles = {}, {}
+    for i in range(count):
+        user_id = f"auth0|{i:08d}"
+        approved = rng.random() >= pending_ratio
+        users[user_id] = {
+            "user_id": user_id,
+            "email": f"user{i}@example.com",
+            "name": f"User {i}",
+            "nickname": f"user{i}",
+            "app_metadata": {"approved": approved},
+        }
+        if approved:
+            user_roles[user_id] = ["rol_admin"] if rng.random() < admin_ratio else ["rol_user"]
+    return users, user_roles
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second on average."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Return 0 if the request may proceed, else the seconds until a token is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+
+def create_fake_auth0(users=100, seed=0, latency=0.0, jitter=0.0, rate_limit=None, token_lifetime=86400):
+    """
+    Create the fake Auth0 Flask app.
+
+    Args:
+        users (int): Number of seeded users.
+        seed (int): Seed of the generated users.
+        latency (float): Seconds added to every response.
+        jitter (float): Maximum random seconds added on top of `latency`.
+        rate_limit (float): Requests per second before 429 responses, None for no limit.
+        token_lifetime (int): `expires_in` of issued tokens.
+
+    Returns:
+        Flask: The app. `app.users`, `app.user_roles` and `app.request_counts` expose its state.
+    """
+    app = Flask("fake_auth0")
+    app.users, app.user_roles = seed_users(users, seed)
+    app.request_counts = {}
+    state_lock = threading.Lock()
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+    signing_key = JsonWebKey.generate_key("RSA", 2048, is_private=True, options={"kid": "fake-auth0-key"})
+    codes = {}  # authorization code -> (user ID, nonce, client ID)
+    tokens = {}  # access token -> user ID, None for Management API tokens
+
+    @app.before_request
+    def simulate_tenant():
+        with state_lock:
+            app.request_counts[request.path] = app.request_counts.get(request.path, 0) + 1
+        if latency or jitter:
+            time.sleep(latency + random.uniform(0, jitter))
+        if limiter:
+            wait = limiter.acquire()
+            if wait:
+                response = jsonify({"statusCode": 429, "error": "Too Many Requests", "message": "Global limit has been reached"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(max(1, round(wait)))
+                response.headers["X-RateLimit-Reset"] = str(int(time.time() + wait) + 1)
+                return response
+
+    def bearer_user():
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in tokens:
+            abort(401)
+        return tokens[token]
+
+    def require_management_token():
+        if bearer_user() is not None:
+            abort(403)
+
+    def issue_token(user_id=None):
+        token = uuid.uuid4().hex
+        tokens[token] = user_id
+        return token
+
+    def user_claims(user):
+        roles = [role["name"] for role in ROLES if role["id"] in app.user_roles.get(user["user_id"], [])]
+        return {
+            "sub": user["user_id"],
+            "name": user["name"],
+            "nickname": user["nickname"],
+            "email": user["email"],
+            f"{NAMESPACE}/roles": roles,
+            f"{NAMESPACE}/approved": user["app_metadata"]["approved"],
+        }
+
+    def paginate(items, total_key):
+        page = request.args.get("page", 0, type=int)
+        per_page = min(request.args.get("per_page", 50, type=int), 100)
+        selected = items[page * per_page:(page + 1) * per_page]
+        if request.args.get("include_totals") == "true":
+            return jsonify({total_key: selected, "start": page * per_page, "limit": per_page, "total": len(items)})
+        return jsonify(selected)
+
+    @app.get("/.well-known/openid-configuration")
+    def openid_configuration():
+        # The issuer is the URL the server was reached on
+        issuer = request.host_url
+        return jsonify({
+            "issuer": issuer,
+            "authorization_endpoint": f"{issuer}authorize",
+            "token_endpoint": f"{issuer}oauth/token",
+            "userinfo_endpoint": f"{issuer}userinfo",
+            "jwks_uri": f"{issuer}.well-known/jwks.json",
+            "end_session_endpoint": f"{issuer}v2/logout",
+            "response_types_supported": ["code"],
+            "subject_types_supported": ["public"],
+            "id_token_signing_alg_values_supported": ["RS256"],
+            "scopes_supported": ["openid", "profile", "email"],
+        })
+
+    @app.get("/.well-known/jwks.json")
+    def jwks():
+        return jsonify({"keys": [signing_key.as_dict(is_private=False, use="sig", alg="RS256")]})
+
+    @app.get("/authorize")
+    def authorize():
+        # Logs in the user given as login_hint, or the first approved user, without a login page
+        user_id = request.args.get("login_hint") or next(
+            user_id for user_id, user in app.users.items() if user["app_metadata"]["approved"])
+        if user_id not in app.users:
+            abort(400)
+        code = uuid.uuid4().hex
+        codes[code] = (user_id, request.args.get("nonce"), request.args.get("client_id"))
+        return redirect(f"{request.args['redirect_uri']}?{urlencode({'code': code, 'state': request.args.get('state', '')})}")
+
+    @app.post("/oauth/token")
+    def oauth_token():
+        data = request.get_json(silent=True) or request.form
+        if data.get("grant_type") == "client_credentials":
+            return jsonify({"access_token": issue_token(), "token_type": "Bearer", "expires_in": token_lifetime})
+        if data.get("grant_type") != "authorization_code" or data.get("code") not in codes:
+            return jsonify({"error": "invalid_grant"}), 403
+
+        user_id, nonce, client_id = codes.pop(data["code"])
+        client_id = client_id or data.get("client_id") or (request.authorization.username if request.authorization else None)
+        now = int(time.time())
+        claims = dict(user_claims(app.users[user_id]), iss=request.host_url, aud=client_id, iat=now, exp=now + 36000)
+        if nonce:
+            claims["nonce"] = nonce
+        id_token = jwt.encode({"alg": "RS256", "kid": signing_key.as_dict()["kid"]}, claims, signing_key).decode("ascii")
+        return jsonify({"access_token": issue_token(user_id), "id_token": id_token, "token_type": "Bearer",
+                        "expires_in": token_lifetime, "scope": "openid profile email"})
+
+    @app.get("/userinfo")
+    def userinfo():
+        user_id = bearer_user()
+        if user_id is None:
+            abort(401)
+        return jsonify(user_claims(app.users[user_id]))
+
+    @app.get("/api/v2/users")
+    def list_users():
+        require_management_token()
+        users = list(app.users.values())
+        match = re.fullmatch(r"app_metadata\.approved:(true|false)", request.args.get("q", ""))
+        if match:
+            approved = match.group(1) == "true"
+            users = [user for user in users if user["app_metadata"]["approved"] == approved]
+        page = request.args.get("page", 0, type=int)
+        per_page = min(request.args.get("per_page", 50, type=int), 100)
+        if (page + 1) * per_page > SEARCH_RESULT_LIMIT:
+            # Like Auth0, the user search only pages through the first 1000 results
+            return jsonify({"statusCode": 400, "error": "Bad Request",
+                            "message": "You can only page through the first 1000 records."}), 400
+        return paginate(users, "users")
+
+    @app.route("/api/v2/users/<user_id>", methods=["GET", "PATCH", "DELETE"])
+    def user(user_id):
+        require_management_token()
+        with state_lock:
+            if user_id not in app.users:
+                abort(404)
+            if request.method == "DELETE":
+                del app.users[user_id]
+                app.user_roles.pop(user_id, None)
+                return "", 204
+            if request.method == "PATCH":
+                app_metadata = (request.get_json(silent=True) or {}).get("app_metadata", {})
+                app.users[user_id]["app_metadata"].update(app_metadata)
+            return jsonify(app.users[user_id])
+
+    @app.get("/api/v2/users/<user_id>/roles")
+    def user_roles(user_id):
+        require_management_token()
+        if user_id not in app.users:
+            abort(404)
+        return jsonify([role for role in ROLES if role["id"] in app.user_roles.get(user_id, [])])
+
+    @app.get("/api/v2/roles")
+    def roles():
+        require_management_token()
+        return jsonify(ROLES)
+
+    @app.get("/api/v2/roles/<role_id>/users")
+    def role_users(role_id):
+        require_management_token()
+        members = [
+            {"user_id": user_id, "email": app.users[user_id]["email"], "name": app.users[user_id]["name"]}
+            for user_id, role_ids in app.user_roles.items() if role_id in role_ids and user_id in app.users
+        ]
+        return paginate(members, "users")
+
+    @app.get("/v2/logout")
+    def logout():
+        return redirect(request.args.get("returnTo", "/"))
+
+    return app
+
+
+def serve_in_thread(app, host="127.0.0.1", port=0):
+    """
+    Serve the fake Auth0 app from a background thread.
+
+    Returns:
+        tuple: (server, base URL). Call server.shutdown() to stop it.
+    """
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="fake-auth0", daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--users", type=int, default=100, help="Number of seeded users.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated users.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random seconds added on top of the latency.")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second before answering 429.")
+    args = parser.parse_args()
+
+    app = create_fake_auth0(args.users, args.seed, args.latency, args.jitter, args.rate_limit)
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Report what importing the application costs a worker at boot, based on `python -X importtime`.
+
+Lists the slowest imports by cumulative time and fails when one of the heavy dependencies that
+are meant to load on first use (pandas, matplotlib, WeasyPrint) is imported at boot. Run from the
+repository root:
+
+    python -m benchmarks.import_time --modules app app.routes --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that must not be imported before a request needs them
+HEAVY_MODULES = ("pandas", "matplotlib", "weasyprint", "numpy")
+
+
+def measure(modules, runs=3):
+    """
+    Import `modules` in fresh interpreters and parse the -X importtime output.
+
+    Args:
+        modules (list): Names of the modules to import.
+        runs (int): Number of interpreters, the fastest time of every module is kept.
+
+    Returns:
+        dict: Cumulative import time in microseconds per imported module.
+    """
+    statement = "; ".join(f"import {module}" for module in modules)
+    timings = {}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        )
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, _, cumulative, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+            timings[name] = min(int(cumulative), timings.get(name, int(cumulative)))
+    return timings
+
+
+def heavy_imports(timings):
+    """Return the heavy dependencies found in the measured imports."""
+    return sorted(name for name in timings if name.split(".")[0] in HEAVY_MODULES and "." not in name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=["app", "app.routes"], help="Modules imported at boot.")
+    parser.add_argument("--runs", type=int, default=3, help="Interpreters to measure, the fastest run counts.")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list.")
+    args = parser.parse_args()
+
+    timings = measure(args.modules, args.runs)
+    total = sum(timings.get(module, 0) for module in args.modules)
+    print(f"Importing {', '.join(args.modules)}: {total / 1000:.0f} ms, {len(timings)} modules")
+    for name, cumulative in sorted(timings.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:8.1f} ms  {name}")
+
+    heavy = heavy_imports(timings)
+    if heavy:
+        print(f"Heavy dependencies imported at boot: {', '.join(heavy)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
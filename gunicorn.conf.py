@@ -0,0 +1,46 @@
+"""
+Gunicorn settings for the Mobilab app:
+
+    gunicorn -c gunicorn.conf.py main:app
+
+By default the app is preloaded: the master imports and builds it once, together with the heavy
+libraries in PRELOAD_MODULES, and the workers forked from it share those pages copy-on-write
+instead of each importing everything again. Every worker then resets the state it must not share
+with the master (database connections, HTTP sessions, locks and background threads) in post_fork.
+Set GUNICORN_PRELOAD=false to load the app separately in every worker.
+"""
+import gc
+import importlib
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", 4))
+# Threaded workers, so overloaded routes can be shed while others keep serving
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Imported on first use by the app, but worth loading once in the master when preloading
+PRELOAD_MODULES = ["pandas", "matplotlib.pyplot"]
+
+
+def when_ready(server):
+    """Load the heavy libraries in the master and freeze its objects before the first fork."""
+    if not preload_app:
+        return
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            server.log.warning(f"Could not preload {module}: {e}")
+    # Objects created so far are never collected, so the collector does not touch (and copy)
+    # the pages the workers share with the master
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Give the new worker its own connections, locks and background threads."""
+    if preload_app:
+        from app.helpers.fork_safety import reinitialize_after_fork
+
+        reinitialize_after_fork()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock
+from app.services.admin_directory_service import AdminDirectoryService
+
+
+class TestAdminDirectoryService(unittest.TestCase):
+    def setUp(self):
+        self.fetch_users = MagicMock(return_value=([{"user_id": "auth0|1", "email": "a@example.com", "name": "A", "role": "admin"}], 1))
+        self.fetch_pending = MagicMock(return_value=([
+            {"user_id": "auth0|2", "email": "b@example.com", "name": "B"},
+            {"user_id": "auth0|3", "email": "c@example.com", "name": "C"},
+        ], 2))
+        self.fetch_roles = MagicMock(return_value={"auth0|1": "admin"})
+        self.service = AdminDirectoryService(ttl=60, per_page=50, fetch_users=self.fetch_users,
+                                             fetch_pending=self.fetch_pending, fetch_roles=self.fetch_roles)
+
+    def test_pages_are_loaded_once_within_ttl(self):
+        """Test that repeated views reuse the loaded pages."""
+        self.service.get_directory()
+        directory = self.service.get_directory()
+
+        self.assertEqual(directory["users_total"], 1)
+        self.assertEqual(len(directory["pending_users"]), 2)
+        self.fetch_users.assert_called_once_with(0, 50, {"auth0|1": "admin"})
+        self.fetch_pending.assert_called_once_with(0, 50)
+
+    def test_other_pages_reuse_the_role_map(self):
+        """Test that a new page only fetches that page, not the roles or pending users again."""
+        self.service.get_directory()
+        self.service.get_directory(page=1)
+
+        self.fetch_users.assert_called_with(1, 50, {"auth0|1": "admin"})
+        self.assertEqual(self.fetch_users.call_count, 2)
+        self.fetch_roles.assert_called_once()
+        self.fetch_pending.assert_called_once()
+
+    def test_approve_and_reject_update_in_place(self):
+        """Test that approvals and rejections update the cached pages without reloading them."""
+        self.service.get_directory()
+        self.service.mark_approved("auth0|2")
+        self.service.mark_rejected("auth0|3")
+        self.service.mark_rejected("auth0|1")
+        directory = self.service.get_directory()
+
+        self.assertEqual(directory["pending_users"], [])
+        self.assertEqual(directory["pending_total"], 0)
+        self.assertEqual(directory["users"], [])
+        # One approved, one rejected
+        self.assertEqual(directory["users_total"], 1)
+        self.fetch_pending.assert_called_once()
+        self.fetch_users.assert_called_once()
+
+    def test_later_pages_are_reloaded(self):
+        """Test that only cached pages after the changed one are loaded again."""
+        self.service.get_directory(page=0, pending_page=0)
+        self.service.get_directory(page=0, pending_page=1)
+        self.service.mark_approved("auth0|2")
+
+        self.service.get_directory(page=0, pending_page=0)
+        self.assertEqual(self.fetch_pending.call_count, 2)
+        self.service.get_directory(page=0, pending_page=1)
+        self.assertEqual(self.fetch_pending.call_count, 3)
+        self.fetch_users.assert_called_once()
+
+    def test_expired_pages_are_reloaded(self):
+        """Test that pages are loaded again after the TTL."""
+        self.service.ttl = 0
+        self.service.get_directory()
+        self.service.get_directory()
+
+        self.assertEqual(self.fetch_pending.call_count, 2)
+        self.assertEqual(self.fetch_roles.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import threading
+import unittest
+import requests
+from unittest.mock import MagicMock, patch
+from app.helpers import auth0_helper
+from app.helpers.auth0_helper import ManagementTokenCache
+
+
+class TestManagementTokenCache(unittest.TestCase):
+    def test_token_is_fetched_once_until_it_expires(self):
+        """Test that the token is reused instead of requested for every call."""
+        fetch_token = MagicMock(return_value=("token", 3600))
+        cache = ManagementTokenCache(fetch_token, refresh_ahead=60)
+
+        self.assertEqual([cache.get() for _ in range(5)], ["token"] * 5)
+        fetch_token.assert_called_once()
+
+    def test_expiring_token_is_refreshed_in_background(self):
+        """Test that one background refresh replaces a token close to its expiry."""
+        refreshed = threading.Event()
+        tokens = iter([("old", 100), ("new", 3600)])
+
+        def fetch_token():
+            token = next(tokens)
+            if token[0] == "new":
+                refreshed.set()
+            return token
+
+        cache = ManagementTokenCache(fetch_token, refresh_ahead=200, expiry_margin=10)
+        self.assertEqual(cache.get(), "old")
+        # Inside the refresh-ahead window the current token is still handed out
+        self.assertEqual(cache.get(), "old")
+        self.assertTrue(refreshed.wait(5))
+        with cache._refresh_lock:
+            self.assertEqual(cache.get(), "new")
+
+    def test_invalidate_fetches_a_new_token(self):
+        """Test that an invalidated token is replaced on the next call."""
+        fetch_token = MagicMock(side_effect=[("first", 3600), ("second", 3600)])
+        cache = ManagementTokenCache(fetch_token)
+        cache.get()
+        cache.invalidate()
+
+        self.assertEqual(cache.get(), "second")
+
+
+class TestIterUsers(unittest.TestCase):
+    def test_every_page_is_read_in_order(self):
+        """Test that users beyond the first page are returned, in page order."""
+        users = [{"user_id": f"auth0|{i}"} for i in range(250)]
+
+        def get_users_page(query, token, page, per_page):
+            return {"users": users[page * per_page:(page + 1) * per_page], "total": len(users)}
+
+        with patch.object(auth0_helper, "get_users_page", side_effect=get_users_page) as mock_page:
+            result = list(auth0_helper.iter_users("q", "token", per_page=100, prefetch=2))
+
+        self.assertEqual(result, users)
+        self.assertEqual(mock_page.call_count, 3)
+
+    def test_paging_stops_at_the_search_limit(self):
+        """Test that pages past Auth0's 1000 result search limit are never requested."""
+        users = [{"user_id": f"auth0|{i}"} for i in range(1500)]
+
+        def get_users_page(query, token, page, per_page):
+            if (page + 1) * per_page > auth0_helper.SEARCH_RESULT_LIMIT:
+                raise requests.HTTPError("400 Bad Request")
+            return {"users": users[page * per_page:(page + 1) * per_page], "total": len(users)}
+
+        with patch.object(auth0_helper, "get_users_page", side_effect=get_users_page), \
+                self.assertLogs(auth0_helper.logger, "WARNING"):
+            result = list(auth0_helper.iter_users("q", "token", per_page=100, prefetch=2))
+
+        self.assertEqual(result, users[:1000])
+        self.assertEqual(auth0_helper.searchable_pages(1500, 50), 20)
+        self.assertEqual(auth0_helper.searchable_pages(120, 50), 3)
+
+
+class TestManagementRequest(unittest.TestCase):
+    def _response(self, status_code, headers=None):
+        return MagicMock(status_code=status_code, headers=headers or {})
+
+    def test_rate_limited_requests_are_retried_after_retry_after(self):
+        """Test that a 429 is retried after the delay Auth0 asks for."""
+        responses = [self._response(429, {"Retry-After": "2"}), self._response(200)]
+        with patch.object(auth0_helper.auth0_session, "request", side_effect=responses) as mock_request, \
+                patch.object(auth0_helper.time, "sleep") as mock_sleep:
+            response = auth0_helper.management_request("PATCH", "https://tenant/api/v2/users/1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_request.call_count, 2)
+        mock_sleep.assert_called_once_with(2)
+
+    def test_retries_are_limited(self):
+        """Test that a request that stays rate limited fails after MAX_RETRIES retries."""
+        response = self._response(429)
+        response.raise_for_status.side_effect = auth0_helper.requests.HTTPError("429")
+        with patch.object(auth0_helper.auth0_session, "request", return_value=response) as mock_request, \
+                patch.object(auth0_helper.time, "sleep"):
+            with self.assertRaises(auth0_helper.requests.HTTPError):
+                auth0_helper.management_request("GET", "https://tenant/api/v2/users")
+
+        self.assertEqual(mock_request.call_count, auth0_helper.MAX_RETRIES + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
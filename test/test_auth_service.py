@@ -0,0 +1,143 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from flask import Flask, session
+from app.services import auth_service
+
+USERS = [
+    {"user_id": "auth0|1", "email": "a@example.com", "name": "A"},
+    {"user_id": "auth0|2", "email": "b@example.com", "name": "B"},
+    {"user_id": "auth0|3", "email": "c@example.com", "name": "C"},
+]
+ROLES = [{"id": "rol_admin", "name": "admin"}, {"id": "rol_user", "name": "user"}]
+
+
+class TestFetchAllUsers(unittest.TestCase):
+    def setUp(self):
+        patches = {
+            "get_management_api_token": patch.object(auth_service, "get_management_api_token", return_value="token"),
+            "get_roles": patch.object(auth_service, "get_roles", return_value=ROLES),
+            "get_role_users": patch.object(auth_service, "get_role_users"),
+            "get_user_roles": patch.object(auth_service, "get_user_roles"),
+            "iter_users": patch.object(auth_service, "iter_users", return_value=iter(USERS)),
+        }
+        self.mocks = {name: p.start() for name, p in patches.items()}
+        for p in patches.values():
+            self.addCleanup(p.stop)
+
+    @staticmethod
+    def _http_error(status_code):
+        return requests.HTTPError(f"{status_code} Error", response=MagicMock(status_code=status_code))
+
+    def test_roles_are_joined_from_role_members(self):
+        """Test that roles come from one members listing per role, not one call per user."""
+        members = {"rol_admin": [{"user_id": "auth0|1"}], "rol_user": [{"user_id": "auth0|1"}, {"user_id": "auth0|2"}]}
+        self.mocks["get_role_users"].side_effect = lambda role_id, token: members[role_id]
+
+        users = auth_service.fetch_all_users()
+
+        self.assertEqual([user["role"] for user in users], ["admin", "user", []])
+        self.assertEqual(self.mocks["get_role_users"].call_count, len(ROLES))
+        self.mocks["get_user_roles"].assert_not_called()
+
+    def test_falls_back_to_per_user_lookups(self):
+        """Test that roles are looked up per user when role members cannot be listed."""
+        self.mocks["get_role_users"].side_effect = self._http_error(403)
+        roles = {"auth0|1": [{"name": "admin"}], "auth0|2": [], "auth0|3": [{"name": "user"}]}
+        self.mocks["get_user_roles"].side_effect = lambda user_id, token: roles[user_id]
+
+        users = auth_service.fetch_all_users()
+
+        self.assertEqual([user["role"] for user in users], ["admin", [], "user"])
+        self.assertEqual(self.mocks["get_user_roles"].call_count, len(USERS))
+
+    def test_other_errors_do_not_fall_back(self):
+        """Test that a rate limited or failing role members listing is an error, not a fallback."""
+        self.mocks["get_role_users"].side_effect = self._http_error(429)
+
+        with self.assertRaises(ValueError):
+            auth_service.fetch_role_map()
+        self.mocks["get_user_roles"].assert_not_called()
+
+    def test_users_page_resolves_roles_of_its_users_only(self):
+        """Test that a page without a role map looks up the roles of the users on that page."""
+        with patch.object(auth_service, "get_users_page", return_value={"users": USERS[:2], "total": 3}):
+            self.mocks["get_user_roles"].return_value = [{"name": "user"}]
+            users, total = auth_service.fetch_users_page(0, 2)
+
+        self.assertEqual(total, 3)
+        self.assertEqual([user["role"] for user in users], ["user", "user"])
+        self.assertEqual(self.mocks["get_user_roles"].call_count, 2)
+
+
+class TestBulkUpdateUsers(unittest.TestCase):
+    def test_results_are_returned_per_user(self):
+        """Test that every user gets a result and one failure does not stop the others."""
+        def approve_user(user_id):
+            if user_id == "auth0|2":
+                raise ValueError("Failed to approve user: 404")
+            return {"success": True, "message": "User approved successfully."}
+
+        with patch.object(auth_service, "approve_user", side_effect=approve_user):
+            results = auth_service.bulk_update_users(["auth0|1", "auth0|2", "auth0|1"], approve=True)
+
+        self.assertEqual(list(results), ["auth0|1", "auth0|2"])
+        self.assertTrue(results["auth0|1"]["success"])
+        self.assertFalse(results["auth0|2"]["success"])
+
+    def test_request_errors_are_reported_per_user(self):
+        """Test that an Auth0 request error fails only that user's result."""
+        def reject_user(user_id):
+            if user_id == "auth0|2":
+                raise requests.Timeout("Read timed out")
+            return {"success": True, "message": "User rejected successfully."}
+
+        with patch.object(auth_service, "reject_user", side_effect=reject_user):
+            results = auth_service.bulk_update_users(["auth0|1", "auth0|2", "auth0|3"], approve=False)
+
+        self.assertEqual([result["success"] for result in results.values()], [True, False, True])
+        self.assertIn("Read timed out", results["auth0|2"]["message"])
+
+
+class TestRejectUser(unittest.TestCase):
+    def test_rejected_user_is_marked_before_delete(self):
+        """Test that a rejected user's approval flag is cleared before the user is deleted."""
+        calls = []
+        with patch.object(auth_service, "update_user_approval", side_effect=lambda *args: calls.append(("patch", *args))), \
+                patch.object(auth_service, "delete_user", side_effect=lambda *args: calls.append(("delete", *args))):
+            auth_service.reject_user("auth0|1")
+
+        self.assertEqual(calls, [("patch", "auth0|1", False), ("delete", "auth0|1")])
+
+
+class TestHandleAuthCallback(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.secret_key = "test"
+        self.request_context = self.app.test_request_context("/callback")
+        self.request_context.push()
+        session["nonce"] = "nonce"
+        self.claims = {"sub": "auth0|1", "email": "a@example.com", "aud": "client", auth_service.APPROVED_CLAIM: True}
+
+    def tearDown(self):
+        self.request_context.pop()
+
+    def test_verified_id_token_claims_skip_userinfo(self):
+        """Test that the claims of the verified ID token are used without calling /userinfo."""
+        with patch.object(auth_service, "get_user_info") as mock_user_info:
+            auth_service.handle_auth_callback({"access_token": "token", "userinfo": self.claims})
+
+        mock_user_info.assert_not_called()
+        self.assertEqual(session["user"], {"sub": "auth0|1", "email": "a@example.com", auth_service.APPROVED_CLAIM: True})
+
+    def test_userinfo_is_the_fallback(self):
+        """Test that /userinfo is called when the ID token lacks the approval claim."""
+        with patch.object(auth_service, "get_user_info", return_value=self.claims) as mock_user_info:
+            auth_service.handle_auth_callback({"access_token": "token", "userinfo": {"sub": "auth0|1"}})
+
+        mock_user_info.assert_called_once_with("token")
+        self.assertEqual(session["user"]["sub"], "auth0|1")
+
+
+if __name__ == "__main__":
+    unittest.main()
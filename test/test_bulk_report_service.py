@@ -0,0 +1,95 @@
+import io
+import unittest
+import zipfile
+from concurrent.futures import Future
+from functools import partial
+from unittest.mock import MagicMock
+from app.helpers.cache import ByteCache
+from app.helpers.zip_stream import stream_zip
+from app.services.bulk_report_service import BulkReportService
+
+
+class TestBulkReportService(unittest.TestCase):
+    def setUp(self):
+        self.futures = []
+        self.render_pool = MagicMock(job_timeout=5)
+        self.render_pool.submit.side_effect = self._submit
+        self.pdf_cache = ByteCache(max_bytes=1024)
+        self.service = BulkReportService(self.render_pool, self.pdf_cache, concurrency=2)
+
+    def _submit(self, fn, html_content, **kwargs):
+        future = Future()
+        if html_content == "broken":
+            future.set_exception(RuntimeError("layout failed"))
+        else:
+            future.set_result(html_content.encode("utf-8"))
+        self.futures.append(future)
+        return future
+
+    def _jobs(self, count, consumed):
+        for i in range(count):
+            consumed.append(i)
+            yield f"report_{i}.pdf", f"key-{i}", partial(self._build, f"pdf {i}")
+
+    def _build(self, html_content):
+        return html_content, {}
+
+    def test_all_reports_are_rendered(self):
+        """Test that every job yields its PDF and the PDFs are cached."""
+        results = list(self.service.render(self._jobs(5, [])))
+
+        self.assertEqual(sorted(name for name, _, _ in results), [f"report_{i}.pdf" for i in range(5)])
+        self.assertEqual(self.pdf_cache.get("key-3"), b"pdf 3")
+
+    def test_jobs_are_consumed_lazily(self):
+        """Test that no more than `concurrency` jobs are taken before results are consumed."""
+        consumed = []
+        results = self.service.render(self._jobs(10, consumed))
+        next(results)
+
+        self.assertLessEqual(len(consumed), 3)
+
+    def test_cached_reports_skip_the_render_pool(self):
+        """Test that cached PDFs are returned without rendering."""
+        self.pdf_cache.put("key-0", b"cached")
+        results = list(self.service.render(self._jobs(1, [])))
+
+        self.assertEqual(results, [("report_0.pdf", b"cached", None)])
+        self.render_pool.submit.assert_not_called()
+
+    def test_failed_reports_are_reported(self):
+        """Test that a failing report yields an error instead of stopping the export."""
+        jobs = [("broken.pdf", "key-broken", partial(self._build, "broken")), ("ok.pdf", "key-ok", partial(self._build, "ok"))]
+        results = {name: (pdf, error) for name, pdf, error in self.service.render(jobs)}
+
+        self.assertEqual(results["ok.pdf"], (b"ok", None))
+        self.assertIsNone(results["broken.pdf"][0])
+        self.assertIsNotNone(results["broken.pdf"][1])
+
+    def test_reports_are_built_only_on_a_cache_miss(self):
+        """Test that cached reports are never built and a failing build yields an error."""
+        self.pdf_cache.put("key-cached", b"cached")
+        build_cached = MagicMock()
+        build_broken = MagicMock(side_effect=ValueError("no metadata"))
+        jobs = [("cached.pdf", "key-cached", build_cached), ("broken.pdf", "key-broken", build_broken)]
+        results = {name: (pdf, error) for name, pdf, error in self.service.render(jobs)}
+
+        build_cached.assert_not_called()
+        self.assertEqual(results["cached.pdf"], (b"cached", None))
+        self.assertIsNone(results["broken.pdf"][0])
+        self.render_pool.submit.assert_not_called()
+
+
+class TestStreamZip(unittest.TestCase):
+    def test_streamed_archive_is_valid(self):
+        """Test that the chunks form a valid archive with every entry."""
+        chunks = list(stream_zip([("a.pdf", b"%PDF a"), ("b.pdf", b"%PDF b")]))
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+        self.assertEqual(archive.namelist(), ["a.pdf", "b.pdf"])
+        self.assertEqual(archive.read("b.pdf"), b"%PDF b")
+        self.assertGreater(len(chunks), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
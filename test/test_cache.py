@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from app.helpers.cache import ByteCache, content_key
+
+
+class TestByteCache(unittest.TestCase):
+    def test_content_key_is_order_independent(self):
+        """Test that dict ordering does not change the content key."""
+        self.assertEqual(
+            content_key({"age": 0.5, "sex": -0.2}, 1),
+            content_key({"sex": -0.2, "age": 0.5}, 1),
+        )
+        self.assertNotEqual(content_key({"age": 0.5}, 1), content_key({"age": 0.5}, 0))
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        """Test that the memory tier stays within its byte budget."""
+        cache = ByteCache(max_bytes=10)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        cache.get("a")
+        cache.put("c", b"cccc")
+
+        self.assertEqual(cache.get("a"), b"aaaa")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), b"cccc")
+        self.assertLessEqual(cache.current_bytes, 10)
+
+    def test_get_or_create_calls_factory_once(self):
+        """Test that repeated lookups only create the content once."""
+        cache = ByteCache(max_bytes=1024)
+        calls = []
+
+        def create():
+            calls.append(1)
+            return b"png"
+
+        for _ in range(3):
+            self.assertEqual(cache.get_or_create("key", create), b"png")
+        self.assertEqual(len(calls), 1)
+
+    def test_disk_tier_is_shared(self):
+        """Test that a second cache on the same directory sees stored entries."""
+        with tempfile.TemporaryDirectory() as disk_dir:
+            ByteCache(max_bytes=1024, disk_dir=disk_dir).put("key", b"png")
+            other = ByteCache(max_bytes=1024, disk_dir=disk_dir)
+
+            self.assertEqual(other.get("key"), b"png")
+            self.assertEqual(os.listdir(disk_dir), ["key"])
+
+
+if __name__ == "__main__":
+    unittest.main()
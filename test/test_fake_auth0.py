@@ -0,0 +1,49 @@
+import os
+import unittest
+from unittest.mock import patch
+from benchmarks.fake_auth0 import create_fake_auth0, serve_in_thread
+from app.helpers import auth0_helper
+from app.services import auth_service
+
+
+class TestAuth0HelpersAgainstFakeAuth0(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = create_fake_auth0(users=250, seed=1)
+        cls.server, base_url = serve_in_thread(cls.fake)
+        cls.environ = patch.dict(os.environ, {"AUTH0_BASE_URL": base_url, "AUTH0_DOMAIN": "fake-auth0.local"})
+        cls.environ.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.environ.stop()
+        cls.server.shutdown()
+        auth0_helper.management_token_cache.invalidate()
+
+    def setUp(self):
+        auth0_helper.management_token_cache.invalidate()
+        self.fake.request_counts.clear()
+
+    def test_fetch_all_users_reads_every_page_with_roles(self):
+        """Test that every approved user is listed with its role in a few Auth0 calls."""
+        users = auth_service.fetch_all_users()
+
+        approved = [user for user in self.fake.users.values() if user["app_metadata"]["approved"]]
+        self.assertEqual(len(users), len(approved))
+        roles = {"rol_admin": "admin", "rol_user": "user"}
+        expected = {user_id: roles[role_ids[0]] for user_id, role_ids in self.fake.user_roles.items()}
+        self.assertEqual({user["user_id"]: user["role"] for user in users if user["role"]}, expected)
+        self.assertNotIn("/api/v2/users/auth0|00000000/roles", self.fake.request_counts)
+
+    def test_bulk_approve_updates_the_tenant(self):
+        """Test that bulk approved users are approved in Auth0."""
+        pending = [user["user_id"] for user in auth0_helper.get_pending_approvals()][:5]
+        results = auth_service.bulk_update_users(pending, approve=True)
+
+        self.assertTrue(all(result["success"] for result in results.values()))
+        self.assertTrue(all(self.fake.users[user_id]["app_metadata"]["approved"] for user_id in pending))
+        self.assertEqual(self.fake.request_counts.get("/oauth/token"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
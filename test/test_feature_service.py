@@ -1,8 +1,9 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from app.services.feature_service import FeatureService
 from app.dao.model_dao import ModelDAO
 from app.form import PredictionForm
+from app.helpers.cache import ByteCache
 from flask import Flask
 
 
@@ -89,6 +90,38 @@ class TestFeatureService(unittest.TestCase):
         # Assertions
         self.assertIsNotNone(plot_path)
 
+    def test_render_contributions_plot_renders_once(self):
+        """Test that the prediction, dashboard and report plots share one render."""
+        feature_service = FeatureService(self.mock_model_dao, ByteCache(max_bytes=1024 * 1024))
+        prediction_result = {
+            "contributions": {"age": 0.5, "sex": -0.2, "BiasTerm": 0.1},
+            "prediction": 1,
+        }
+
+        with patch.object(
+            feature_service, "_generate_contributions_plot", wraps=feature_service._generate_contributions_plot
+        ) as render:
+            plot_buffer, _ = feature_service.process_contributions(prediction_result, ["age", "sex"])
+            dashboard_plot = feature_service.render_contributions_plot(prediction_result["contributions"], 1)
+            report_plot = feature_service.render_contributions_plot(prediction_result["contributions"], 1)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(plot_buffer.getvalue(), dashboard_plot)
+        self.assertEqual(dashboard_plot, report_plot)
+
+    def test_render_contributions_plot_svg(self):
+        """Test that the SVG backend renders sorted bars without matplotlib."""
+        feature_service = FeatureService(self.mock_model_dao, chart_format="svg")
+
+        plot = feature_service.render_contributions_plot({"age": 0.1, "sex": -0.4, "BiasTerm": 0.0}, 1)
+        data_uri = feature_service.contributions_plot_data_uri({"age": 0.1, "BiasTerm": 0.0}, 1)
+
+        svg = plot.decode("utf-8")
+        self.assertTrue(svg.startswith("<svg"))
+        self.assertIn("Feature Contributions (Prediction: Disease)", svg)
+        self.assertLess(svg.index(">sex<"), svg.index(">age<"))
+        self.assertTrue(data_uri.startswith("data:image/svg+xml;base64,"))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+import unittest
+from app.dao.model_dao import ModelDAO
+from app.helpers import fork_safety
+from app.helpers.cache import ByteCache
+from app.helpers.write_behind import WriteBehindBuffer
+
+
+class TestForkSafety(unittest.TestCase):
+    def test_reinitialize_resets_registered_objects(self):
+        """Test that held locks and inherited connections are replaced."""
+        cache = ByteCache(max_bytes=1024)
+        cache._lock.acquire()
+        model_dao = ModelDAO()
+        model_dao.local.connection = object()
+
+        fork_safety.reinitialize_after_fork()
+
+        self.assertFalse(cache._lock.locked())
+        self.assertFalse(hasattr(model_dao.local, "connection"))
+
+    def test_registered_functions_run(self):
+        """Test that module-level reset functions run after a fork."""
+        calls = []
+        fork_safety.register_function(lambda: calls.append(True))
+        try:
+            fork_safety.reinitialize_after_fork()
+        finally:
+            fork_safety._functions.pop()
+        self.assertEqual(calls, [True])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "Requires os.fork")
+    def test_forked_worker_does_not_deadlock(self):
+        """Test that a worker forked while a thread holds a lock can use the service."""
+        cache = ByteCache(max_bytes=1024)
+        buffer = WriteBehindBuffer(lambda batch: None, flush_interval=0.05)
+        buffer.append({"record": 1})
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with cache._lock:
+                locked.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        locked.wait(5)
+        pid = os.fork()
+        if pid == 0:
+            fork_safety.reinitialize_after_fork()
+            cache.put("key", b"value")
+            os._exit(0 if cache.get("key") == b"value" and buffer.append({"record": 2}) else 1)
+
+        release.set()
+        thread.join()
+        buffer.close()
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            finished, status = os.waitpid(pid, os.WNOHANG)
+            if finished:
+                self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+                return
+            time.sleep(0.05)
+        os.kill(pid, 9)
+        self.fail("The forked worker deadlocked.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+from benchmarks.import_time import heavy_imports, measure
+
+
+class TestImportTime(unittest.TestCase):
+    def test_boot_does_not_import_heavy_dependencies(self):
+        """Test that importing the app and its routes leaves pandas, matplotlib and WeasyPrint for first use."""
+        timings = measure(["app", "app.routes"], runs=1)
+        self.assertIn("app", timings)
+        self.assertEqual(heavy_imports(timings), [])
+
+    def test_lazy_module_imports_on_first_use(self):
+        """Test that a lazy facade imports its module when an attribute is used."""
+        from app.helpers.lazy_imports import LazyModule
+
+        json = LazyModule("json")
+        self.assertEqual(json.dumps([1]), "[1]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import threading
+import unittest
+from flask import Flask
+from app.helpers.load_shedder import LoadShedder, Overloaded
+
+
+class TestLoadShedder(unittest.TestCase):
+    def test_concurrency_limit(self):
+        """Test that requests beyond the concurrency limit are shed until one finishes."""
+        shedder = LoadShedder("test", max_concurrent=2)
+        shedder.acquire()
+        shedder.acquire()
+        with self.assertRaises(Overloaded):
+            shedder.acquire()
+        self.assertEqual(shedder.shed, 1)
+
+        shedder.release(0.1)
+        shedder.acquire()
+
+    def test_sheds_on_slow_upstream(self):
+        """Test that a high average latency sheds requests that would wait too long."""
+        shedder = LoadShedder("test", max_concurrent=4, max_wait=1)
+        for _ in range(3):
+            shedder.acquire()
+            shedder.release(6.0)
+
+        # Idle routes always admit a request, so the average keeps being updated
+        shedder.acquire()
+        with self.assertRaises(Overloaded) as context:
+            shedder.acquire()
+        self.assertEqual(context.exception.retry_after, 6)
+
+        # Faster responses bring the average down and requests are admitted again
+        for _ in range(20):
+            shedder.release(0.1)
+            shedder.acquire()
+        shedder.acquire()
+        self.assertEqual(shedder.in_flight, 2)
+
+    def test_route_returns_503(self):
+        """Test that a shed request gets a 503 while other methods and routes keep working."""
+        app = Flask(__name__)
+        shedder = LoadShedder("test", max_concurrent=1, methods=("POST",))
+        started, finish = threading.Event(), threading.Event()
+
+        @app.route("/slow", methods=["GET", "POST"])
+        @shedder
+        def slow():
+            started.set()
+            finish.wait(5)
+            return "done"
+
+        @app.route("/models")
+        def models():
+            return "models"
+
+        thread = threading.Thread(target=lambda: app.test_client().post("/slow"))
+        thread.start()
+        started.wait(5)
+        try:
+            client = app.test_client()
+            response = client.post("/slow")
+            self.assertEqual(response.status_code, 503)
+            self.assertIn("Retry-After", response.headers)
+            self.assertEqual(client.get("/models").status_code, 200)
+        finally:
+            finish.set()
+            thread.join()
+        self.assertEqual(shedder.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import os
+import unittest
+from unittest.mock import MagicMock
+from flask import Flask
+from app.services.model_report_service import ModelReportService
+
+REPORT = {
+    "class 0": {"precision": 0.9, "recall": 0.8, "f1-score": 0.85, "support": 10},
+    "accuracy": 0.85,
+    "macro avg": {"precision": 0.9, "recall": 0.8, "f1-score": 0.85, "support": 10},
+    "weighted avg": {"precision": 0.9, "recall": 0.8, "f1-score": 0.85, "support": 10},
+}
+
+
+class TestModelReportService(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__, template_folder=os.path.join(os.path.dirname(__file__), "..", "app", "templates"))
+        self.request_context = self.app.test_request_context("/models")
+        self.request_context.push()
+
+        self.mock_model_dao = MagicMock()
+        self.mock_model_dao.get_metrics.return_value = {"version": "1", "trainingShape": '{"rows": 10, "columns": 2}'}
+        self.mock_model_dao.get_plots.return_value = {"auc": "static/plots/auc.png"}
+        self.mock_model_dao.get_report.return_value = {"report": json.dumps(REPORT)}
+        self.service = ModelReportService(self.mock_model_dao)
+
+    def tearDown(self):
+        self.request_context.pop()
+
+    def test_sections_are_rendered_once_per_version(self):
+        """Test that repeated views reuse the rendered sections."""
+        first = self.service.get_model_sections("model")
+        second = self.service.get_model_sections("model")
+
+        self.assertIs(first, second)
+        self.assertEqual([section["title"] for section in first], ["Model Metadata", "Model Plots", "Model Report"])
+        self.mock_model_dao.get_plots.assert_called_once_with("model")
+
+    def test_sections_are_rebuilt_on_version_change(self):
+        """Test that a new model version invalidates the cached sections."""
+        self.service.get_model_sections("model")
+        self.mock_model_dao.get_metrics.return_value = {"version": "2", "trainingShape": '{"rows": 20, "columns": 2}'}
+        sections = self.service.get_model_sections("model")
+
+        self.assertEqual(self.mock_model_dao.get_plots.call_count, 2)
+        self.assertIn("Rows: 20", sections[0]["content"])
+
+    def test_metadata_is_not_modified(self):
+        """Test that the caller's metadata keeps its original values."""
+        metadata = {"version": "1", "trainingShape": '{"rows": 10, "columns": 2}'}
+        self.service.get_model_sections("model", metadata)
+        self.assertIsInstance(metadata["trainingShape"], str)
+
+    def test_section_values_are_escaped(self):
+        """Test that values are escaped by the report section macros."""
+        metadata = {"version": "1", "note": "<script>alert(1)</script>"}
+        sections = self.service.get_model_sections("model", metadata)
+
+        self.assertIn("&lt;script&gt;", sections[0]["content"])
+        self.assertNotIn("<script>", sections[0]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
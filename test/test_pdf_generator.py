@@ -0,0 +1,98 @@
+import base64
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from app.helpers import pdf_generator
+from app.helpers.pdf_generator import LocalURLFetcher
+
+
+class TestLocalURLFetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.tmp_dir.name, "plots"))
+        with open(os.path.join(self.tmp_dir.name, "plots", "auc.png"), "wb") as f:
+            f.write(b"\x89PNG")
+        self.fetcher = LocalURLFetcher(self.tmp_dir.name, "/static", "http://localhost:5000/")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_static_urls_are_read_from_disk(self):
+        """Test that static URLs on the app's host never go over HTTP."""
+        result = self.fetcher("http://localhost:5000/static/plots/auc.png")
+
+        self.assertEqual(result["string"], b"\x89PNG")
+        self.assertEqual(result["mime_type"], "image/png")
+        self.assertEqual(self.fetcher.fetch_count, 1)
+
+    def test_data_urls_are_decoded(self):
+        """Test that Base64 data URLs are decoded in memory."""
+        data = base64.b64encode(b"<svg></svg>").decode("utf-8")
+        result = self.fetcher(f"data:image/svg+xml;base64,{data}")
+
+        self.assertEqual(result["string"], b"<svg></svg>")
+        self.assertEqual(result["mime_type"], "image/svg+xml")
+
+    def test_file_urls_in_static_folder_are_read_from_cache(self):
+        """Test that URLs relative to the report stylesheet are served from the static folder."""
+        path = os.path.join(os.path.realpath(self.tmp_dir.name), "plots", "auc.png")
+        result = self.fetcher(f"file://{path}")
+
+        self.assertEqual(result["string"], b"\x89PNG")
+
+    def test_paths_outside_static_folder_are_refused(self):
+        """Test that URLs cannot escape the static folder."""
+        self.assertIsNone(self.fetcher._static_path("../../etc/passwd"))
+        self.assertIsNotNone(self.fetcher._static_path("plots/auc.png"))
+
+
+class TestReportResources(unittest.TestCase):
+    def setUp(self):
+        pdf_generator._report_resources = None
+        self.weasyprint = MagicMock()
+        self.fonts = MagicMock()
+        self.modules = patch.dict("sys.modules", {
+            "weasyprint": self.weasyprint,
+            "weasyprint.text": MagicMock(fonts=self.fonts),
+            "weasyprint.text.fonts": self.fonts,
+        })
+        self.modules.start()
+
+    def tearDown(self):
+        self.modules.stop()
+        pdf_generator._report_resources = None
+
+    def test_stylesheet_is_parsed_once(self):
+        """Test that every render reuses the parsed stylesheet and font configuration."""
+        first = pdf_generator.report_resources()
+        second = pdf_generator.report_resources()
+
+        self.assertEqual(first, second)
+        self.weasyprint.CSS.assert_called_once()
+        self.fonts.FontConfiguration.assert_called_once()
+
+    def test_html_to_pdf_uses_shared_resources(self):
+        """Test that the layout receives the preloaded stylesheets and fonts."""
+        stylesheets, font_config = pdf_generator.report_resources()
+        self.weasyprint.HTML.return_value.render.return_value.write_pdf.return_value = b"%PDF"
+
+        self.assertEqual(pdf_generator.html_to_pdf("<html></html>"), b"%PDF")
+        self.weasyprint.HTML.return_value.render.assert_called_once_with(stylesheets=stylesheets, font_config=font_config)
+
+    def test_model_pages_are_laid_out_once_per_key(self):
+        """Test that the model pages are reused by later reports on the same model version."""
+        document = self.weasyprint.HTML.return_value.render.return_value
+        document.copy.return_value.write_pdf.return_value = b"%PDF"
+        pdf_generator._model_documents.clear()
+        self.addCleanup(pdf_generator._model_documents.clear)
+
+        for prediction in ("<p>1</p>", "<p>2</p>"):
+            self.assertEqual(pdf_generator.html_to_pdf(prediction, model_html="<p>model</p>", model_key="m1"), b"%PDF")
+
+        laid_out = [call.kwargs["string"] for call in self.weasyprint.HTML.call_args_list]
+        self.assertEqual(laid_out, ["<p>1</p>", "<p>model</p>", "<p>2</p>"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from app.dao import prediction_history_dao
+from app.dao.prediction_history_dao import PredictionHistoryDAO, CREATE_TABLE_SQL
+
+
+class TestPredictionHistoryDAO(unittest.TestCase):
+    def setUp(self):
+        self.connection = MagicMock(open=True)
+        self.cursor = self.connection.cursor.return_value.__enter__.return_value
+        self.cursor.fetchall.return_value = []
+        self.cursor.fetchmany.return_value = []
+        patcher = patch.object(prediction_history_dao, "get_connection", return_value=self.connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.dao = PredictionHistoryDAO()
+
+    def test_reads_create_the_table_first(self):
+        """Test that reading a fresh database creates the table instead of failing."""
+        self.assertEqual(self.dao.get_predictions(), [])
+        self.assertEqual(list(self.dao.iter_predictions()), [])
+
+        statements = [call.args[0] for call in self.cursor.execute.call_args_list]
+        self.assertEqual(statements[0], CREATE_TABLE_SQL)
+        self.assertEqual(statements.count(CREATE_TABLE_SQL), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
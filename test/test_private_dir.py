@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from app.helpers.private_dir import app_data_dir
+
+
+class TestAppDataDir(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.directory = os.path.join(self.tmp_dir.name, "data")
+
+    def test_directory_is_created_private(self):
+        """Test that a missing data directory is created accessible only to this user."""
+        with patch.dict(os.environ, {"APP_DATA_DIR": self.directory}):
+            self.assertEqual(app_data_dir(), self.directory)
+
+        self.assertEqual(os.stat(self.directory).st_mode & 0o777, 0o700)
+
+    def test_shared_directory_is_refused(self):
+        """Test that a directory other users can read is not used for prediction data."""
+        os.mkdir(self.directory)
+        os.chmod(self.directory, 0o755)
+        with patch.dict(os.environ, {"APP_DATA_DIR": self.directory}):
+            with self.assertRaises(RuntimeError):
+                app_data_dir()
+
+    def test_default_is_per_user(self):
+        """Test that the default directory is specific to this user."""
+        with patch.dict(os.environ, {"APP_DATA_DIR": ""}), \
+                patch("tempfile.gettempdir", return_value=self.tmp_dir.name):
+            directory = app_data_dir()
+
+        self.assertEqual(directory, os.path.join(self.tmp_dir.name, f"mobilab-{os.getuid()}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
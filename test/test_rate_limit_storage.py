@@ -0,0 +1,75 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from app.helpers.rate_limit_storage import SQLiteStorage, DEFAULT_DB_PATH, sqlite_uri
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "limits.sqlite3")
+        self.uri = sqlite_uri(self.db_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_registered_scheme(self):
+        """Test that sqlite:// URIs resolve to the SQLite storage."""
+        self.assertIsInstance(storage_from_string(self.uri), SQLiteStorage)
+
+    def test_database_location(self):
+        """Test that the database is created at the path in the URI."""
+        storage = storage_from_string(self.uri)
+
+        self.assertEqual(storage.db_path, self.db_path)
+        self.assertTrue(os.path.isfile(self.db_path))
+
+    def test_default_database_location(self):
+        """Test that the default URI points at the temp directory, not a path starting with //."""
+        # Not connecting, so the test does not create the app's own database
+        with patch.object(SQLiteStorage, "_connection"):
+            storage = storage_from_string(sqlite_uri(DEFAULT_DB_PATH))
+
+        self.assertEqual(storage.db_path, os.path.join(tempfile.gettempdir(), "mobilab_limits.sqlite3"))
+        self.assertFalse(storage.db_path.startswith("//"))
+
+    def test_incr_and_expiry(self):
+        """Test that counters add up within a window and restart once it has expired."""
+        storage = SQLiteStorage(self.uri)
+        self.assertEqual(storage.incr("key", 1), 1)
+        self.assertEqual(storage.incr("key", 1, amount=2), 3)
+        self.assertEqual(storage.get("key"), 3)
+        self.assertGreater(storage.get_expiry("key"), time.time())
+
+        time.sleep(1.1)
+        self.assertEqual(storage.get("key"), 0)
+        self.assertEqual(storage.incr("key", 1), 1)
+
+        storage.clear("key")
+        self.assertEqual(storage.get("key"), 0)
+
+    def test_limits_are_shared_between_workers(self):
+        """Test that two storages on the same database enforce one limit together."""
+        item = parse("3 per minute")
+        first = FixedWindowRateLimiter(SQLiteStorage(self.uri))
+        second = FixedWindowRateLimiter(SQLiteStorage(self.uri))
+
+        self.assertTrue(first.hit(item, "127.0.0.1"))
+        self.assertTrue(second.hit(item, "127.0.0.1"))
+        self.assertTrue(first.hit(item, "127.0.0.1"))
+        self.assertFalse(second.hit(item, "127.0.0.1"))
+        self.assertTrue(second.hit(item, "10.0.0.1"))
+
+    def test_requires_a_path(self):
+        """Test that a URI without a database path is rejected."""
+        with self.assertRaises(ValueError):
+            SQLiteStorage("sqlite://")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import concurrent.futures
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from app.helpers.render_pool import RenderPool, RenderPoolBusy
+
+
+class TestRenderPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = RenderPool(max_workers=1, max_queue=0, job_timeout=10, queue_timeout=0.05)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_run_inline_without_workers(self):
+        """Test that a pool without workers runs jobs on the calling thread."""
+        pool = RenderPool(max_workers=0)
+        self.assertEqual(pool.run(pow, 2, 10), 1024)
+        self.assertEqual(pool.submit(pow, 2, 3).result(), 8)
+
+    def test_run_in_worker_process(self):
+        """Test that jobs run in a worker process and return their result."""
+        self.assertEqual(self.pool.run(pow, 2, 10), 1024)
+
+    def test_rejects_jobs_when_queue_is_full(self):
+        """Test back-pressure once every slot is taken."""
+        future = self.pool.submit(time.sleep, 0.5)
+        with self.assertRaises(RenderPoolBusy):
+            self.pool.submit(time.sleep, 0)
+        future.result(timeout=10)
+
+    def test_run_times_out(self):
+        """Test that waiting for a slow job is bounded by the timeout."""
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            self.pool.run(time.sleep, 2, timeout=0.2)
+
+    def test_run_cancels_timed_out_job(self):
+        """Test that a job whose future times out is cancelled, whichever TimeoutError the future raises."""
+        future = MagicMock()
+        future.result.side_effect = concurrent.futures.TimeoutError()
+        with patch.object(self.pool, "submit", return_value=future):
+            with self.assertRaises(concurrent.futures.TimeoutError):
+                self.pool.run(time.sleep, 2, timeout=0.2)
+        future.cancel.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from app.helpers.cache import ByteCache
+from app.helpers.render_pool import RenderPool
+from app.helpers.state_store import StateStore
+from app.services.report_job_service import ReportJobService, ReportJobRejected
+
+
+class TestReportJobService(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        job_store = StateStore(max_bytes=0, db_path=os.path.join(self.tmp_dir.name, "jobs.sqlite3"))
+        self.pdf_cache = ByteCache(max_bytes=1024 * 1024)
+        self.service = ReportJobService(
+            job_store,
+            RenderPool(max_workers=0),
+            self.pdf_cache,
+            result_dir=os.path.join(self.tmp_dir.name, "results"),
+            max_jobs_per_user=1,
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _wait_for(self, job_id, owner):
+        for _ in range(50):
+            job = self.service.get_job(job_id, owner)
+            if job["status"] in ("done", "failed"):
+                return job
+            time.sleep(0.02)
+        self.fail("Report job did not finish in time.")
+
+    def test_results_default_to_the_private_data_directory(self):
+        """Test that finished PDFs are kept in the app data directory, readable only by this user."""
+        data_dir = os.path.join(self.tmp_dir.name, "data")
+        with patch.dict(os.environ, {"APP_DATA_DIR": data_dir}):
+            service = ReportJobService(self.service.job_store, RenderPool(max_workers=0))
+
+        self.assertEqual(service.result_dir, os.path.join(data_dir, "report_jobs"))
+        self.assertEqual(os.stat(data_dir).st_mode & 0o777, 0o700)
+        self.assertEqual(os.stat(service.result_dir).st_mode & 0o777, 0o700)
+
+    @patch("app.services.report_job_service.html_to_pdf", return_value=b"%PDF")
+    def test_job_produces_pdf(self, mock_html_to_pdf):
+        """Test that a submitted job renders the PDF in the background."""
+        job_id = self.service.submit("auth0|1", "key", "<html></html>")
+
+        self.assertEqual(self._wait_for(job_id, "auth0|1")["status"], "done")
+        with open(self.service.result_path(job_id), "rb") as f:
+            self.assertEqual(f.read(), b"%PDF")
+        self.assertEqual(self.pdf_cache.get("key"), b"%PDF")
+        self.assertIsNone(self.service.get_job(job_id, "auth0|2"))
+
+    @patch("app.services.report_job_service.html_to_pdf")
+    def test_cached_report_is_done_immediately(self, mock_html_to_pdf):
+        """Test that cached PDFs skip the render."""
+        self.pdf_cache.put("key", b"%PDF")
+        job_id = self.service.submit("auth0|1", "key", "<html></html>")
+
+        self.assertEqual(self.service.get_job(job_id, "auth0|1")["status"], "done")
+        mock_html_to_pdf.assert_not_called()
+
+    def test_rejects_jobs_above_user_cap(self):
+        """Test that a user cannot queue more jobs than allowed."""
+        release = threading.Event()
+
+        def slow_render(html_content, **render_options):
+            release.wait(5)
+            return b"%PDF"
+
+        with patch("app.services.report_job_service.html_to_pdf", side_effect=slow_render):
+            job_id = self.service.submit("auth0|1", "key-1", "<html></html>")
+            with self.assertRaises(ReportJobRejected):
+                self.service.submit("auth0|1", "key-2", "<html></html>")
+            release.set()
+            self._wait_for(job_id, "auth0|1")
+
+
+if __name__ == "__main__":
+    unittest.main()
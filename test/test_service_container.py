@@ -0,0 +1,41 @@
+import unittest
+from flask import Flask
+from app.factories.service_container import ServiceContainer, SINGLETON, REQUEST
+
+
+class TestServiceContainer(unittest.TestCase):
+    def setUp(self):
+        self.container = ServiceContainer()
+        self.container.register("dao", lambda c: object(), SINGLETON)
+        self.container.register("service", lambda c: {"dao": c.get("dao")}, SINGLETON)
+        self.container.register("builder", lambda c: {"dao": c.get("dao")}, REQUEST)
+
+    def test_singletons_are_shared(self):
+        """Test that a singleton is built once and shared by the services depending on it."""
+        self.assertIs(self.container.get("service"), self.container.get("service"))
+        self.assertIs(self.container.get("service")["dao"], self.container.get("dao"))
+
+    def test_request_lifetime(self):
+        """Test that per-request services are reused within a request and rebuilt for the next."""
+        app = Flask(__name__)
+        with app.test_request_context("/"):
+            first = self.container.get("builder")
+            self.assertIs(self.container.get("builder"), first)
+            self.assertIs(first["dao"], self.container.get("dao"))
+        with app.test_request_context("/"):
+            self.assertIsNot(self.container.get("builder"), first)
+
+    def test_reset(self):
+        """Test that a reset singleton is built again."""
+        dao = self.container.get("dao")
+        self.container.reset("dao")
+        self.assertIsNot(self.container.get("dao"), dao)
+
+    def test_unknown_service(self):
+        """Test that resolving an unregistered service raises a KeyError."""
+        with self.assertRaises(KeyError):
+            self.container.get("unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
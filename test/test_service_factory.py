@@ -17,5 +17,13 @@ class TestServiceFactory(unittest.TestCase):
         prediction_service = ServiceFactory.create_prediction_service()
         self.assertIsInstance(prediction_service, PredictionService)
 
+    def test_services_share_dependencies(self):
+        """Test that services built by the factory share their singleton dependencies."""
+        model_dao = ServiceFactory.create_model_dao()
+        prediction_service = ServiceFactory.create_prediction_service()
+        self.assertIs(prediction_service.feature_service, ServiceFactory.create_feature_service())
+        self.assertIs(prediction_service.feature_service.model_dao, model_dao)
+        self.assertIs(ServiceFactory.create_model_report_service().model_dao, model_dao)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
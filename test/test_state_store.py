@@ -0,0 +1,60 @@
+import os
+import tempfile
+import time
+import unittest
+from app.helpers.state_store import StateStore
+from app.helpers.session_helper import store_prediction_results, load_prediction_results
+
+
+class TestStateStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "state.sqlite3")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load(self):
+        """Test that a saved payload is returned by its ID."""
+        store = StateStore()
+        state_id = store.save({"prediction": 1})
+        self.assertEqual(store.load(state_id), {"prediction": 1})
+        self.assertIsNone(store.load("unknown"))
+
+    def test_entries_expire(self):
+        """Test that entries are not returned after their TTL."""
+        store = StateStore(ttl=0.05, db_path=self.db_path)
+        state_id = store.save({"prediction": 1})
+        time.sleep(0.1)
+        self.assertIsNone(store.load(state_id))
+
+    def test_shared_tier_between_workers(self):
+        """Test that a second store on the same database sees saved state."""
+        state_id = StateStore(db_path=self.db_path).save({"prediction": 0})
+        self.assertEqual(StateStore(db_path=self.db_path).load(state_id), {"prediction": 0})
+
+    def test_memory_tier_is_bounded(self):
+        """Test that the in-process tier evicts entries beyond its byte budget."""
+        store = StateStore(max_bytes=40)
+        first = store.save({"value": "x" * 20})
+        second = store.save({"value": "y" * 20})
+        self.assertIsNone(store.load(first))
+        self.assertIsNotNone(store.load(second))
+        self.assertLessEqual(store.current_bytes, 40)
+
+    def test_session_keeps_only_the_state_id(self):
+        """Test that prediction results stay out of the cookie session."""
+        store = StateStore()
+        session = {}
+        result = {"prediction": 1, "contributions": {"age": 0.5}}
+        store_prediction_results(session, result, {"age": 30}, "Explanation", "model", store)
+        first_id = session["prediction_id"]
+        store_prediction_results(session, result, {"age": 31}, "Explanation", "model", store)
+
+        self.assertEqual(list(session), ["prediction_id"])
+        self.assertIsNone(store.load(first_id))
+        self.assertEqual(load_prediction_results(session, store)["prediction_values"], {"age": 31})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from jinja2 import FileSystemBytecodeCache
+from app.helpers import template_cache
+
+
+class TestBytecodeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.multiple(template_cache, _bytecode_cache=None, _bytecode_cache_loaded=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_private_directory_is_used(self):
+        """Test that a missing JINJA_CACHE_DIR is created private to this user."""
+        directory = os.path.join(self.tmp_dir.name, "jinja")
+        with patch.dict(os.environ, {"JINJA_CACHE_DIR": directory}):
+            cache = template_cache.bytecode_cache()
+
+        self.assertIsInstance(cache, FileSystemBytecodeCache)
+        self.assertEqual(cache.directory, directory)
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+
+    def test_shared_directory_is_refused(self):
+        """Test that a directory other users can write to is not used."""
+        directory = os.path.join(self.tmp_dir.name, "jinja")
+        os.mkdir(directory)
+        os.chmod(directory, 0o777)
+        with patch.dict(os.environ, {"JINJA_CACHE_DIR": directory}):
+            self.assertIsNone(template_cache.bytecode_cache())
+
+    def test_symlinked_directory_is_refused(self):
+        """Test that a symlink planted in place of the directory is not followed."""
+        target = os.path.join(self.tmp_dir.name, "target")
+        os.mkdir(target, 0o700)
+        link = os.path.join(self.tmp_dir.name, "jinja")
+        os.symlink(target, link)
+        with patch.dict(os.environ, {"JINJA_CACHE_DIR": link}):
+            self.assertIsNone(template_cache.bytecode_cache())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from app.helpers.write_behind import WriteBehindBuffer
+
+
+class TestWriteBehindBuffer(unittest.TestCase):
+    def test_flushes_in_batches(self):
+        """Test that appended records are written in batches of at most batch_size."""
+        batches = []
+        buffer = WriteBehindBuffer(batches.append, batch_size=3, flush_interval=0.05)
+
+        for record in range(7):
+            self.assertTrue(buffer.append(record))
+        buffer.close()
+
+        self.assertEqual([record for batch in batches for record in batch], list(range(7)))
+        self.assertTrue(all(len(batch) <= 3 for batch in batches))
+
+    def test_retries_failed_batches(self):
+        """Test that a failing write is retried before giving up."""
+        attempts = []
+
+        def write_batch(batch):
+            attempts.append(batch)
+            if len(attempts) == 1:
+                raise RuntimeError("Database unavailable")
+
+        buffer = WriteBehindBuffer(write_batch, batch_size=10, flush_interval=0.05, max_retries=2)
+        buffer.append("record")
+        buffer.close()
+
+        self.assertEqual(attempts, [["record"], ["record"]])
+        self.assertEqual(buffer.dropped, 0)
+
+    def test_drops_records_when_full(self):
+        """Test that append never blocks when the buffer is full."""
+        buffer = WriteBehindBuffer(lambda batch: None, max_pending=1)
+        buffer._ensure_started = lambda: None  # Keep the writer from draining the queue
+
+        self.assertTrue(buffer.append("first"))
+        self.assertFalse(buffer.append("second"))
+        self.assertEqual(buffer.dropped, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()